@@ -1,32 +1,25 @@
 import sys
 import os
+import importlib.util
 
 print("Python version:", sys.version)
 print("Python path:", sys.executable)
 print("Current directory:", os.getcwd())
 print("\nChecking imports:")
 
-try:
-    import cv2
-    print("✓ OpenCV imported")
-except ImportError:
-    print("✗ OpenCV not found")
-
-try:
-    import torch
-    print("✓ PyTorch imported")
-except ImportError:
-    print("✗ PyTorch not found")
-
-try:
-    import PyQt5
-    print("✓ PyQt5 imported")
-except ImportError:
-    print("✗ PyQt5 not found")
+# find_spec chỉ tìm module, không thực thi import (torch/cv2 rất nặng)
+for module_name, label in [('cv2', 'OpenCV'), ('torch', 'PyTorch'), ('PyQt5', 'PyQt5')]:
+    if importlib.util.find_spec(module_name) is not None:
+        print(f"✓ {label} found")
+    else:
+        print(f"✗ {label} not found")
 
 print("\nChecking project structure:")
+# One directory listing instead of a stat() per folder
+with os.scandir('.') as entries:
+    existing_dirs = {e.name for e in entries if e.is_dir(follow_symlinks=False)}
 for folder in ['models', 'views', 'controllers', 'dal', 'utils', 'tests']:
-    if os.path.exists(folder):
+    if folder in existing_dirs:
         print(f"✓ {folder}/ exists")
     else:
         print(f"✗ {folder}/ not found")
\ No newline at end of file
@@ -6,6 +6,36 @@ Place this in your project root directory
 import os
 from pathlib import Path
 
+# Build/cache directories that must never be descended into or get __init__.py
+_SKIP = {'__pycache__', '.git', '.venv', 'venv', 'node_modules',
+         '.mypy_cache', '.pytest_cache'}
+
+
+def _scan_dir(path, cache):
+    """List a directory once and cache {name: is_dir} for later lookups"""
+    if path not in cache:
+        try:
+            with os.scandir(path) as entries:
+                cache[path] = {
+                    entry.name: entry.is_dir(follow_symlinks=False)
+                    for entry in entries
+                    if entry.name not in _SKIP and not entry.name.startswith('.')
+                }
+        except FileNotFoundError:
+            cache[path] = {}
+    return cache[path]
+
+
+def _dir_exists(root, rel_path, cache):
+    """Walk rel_path level by level using cached scandir results"""
+    current = root
+    for part in rel_path.split('/'):
+        if not _scan_dir(current, cache).get(part):
+            return False
+        current = os.path.join(current, part)
+    return True
+
+
 def check_and_create_init_files():
     """Check and create missing __init__.py files"""
     
@@ -24,21 +54,27 @@ def check_and_create_init_files():
     }
     
     current_dir = Path.cwd()
+    root = str(current_dir)
+    scan_cache = {}
     print(f"Checking project structure in: {current_dir}")
     print("=" * 50)
     
     for dir_path, init_content in required_structure.items():
+        if '__pycache__' in dir_path:
+            print(f"✗ Skipped cache dir: {dir_path}/")
+            continue
         full_path = current_dir / dir_path
         init_file = full_path / '__init__.py'
         
         # Check if directory exists
-        if not full_path.exists():
+        if not _dir_exists(root, dir_path, scan_cache):
             print(f"✗ Directory missing: {dir_path}/")
             full_path.mkdir(parents=True, exist_ok=True)
+            scan_cache.clear()  # Tree changed, drop cached listings
             print(f"  → Created directory: {dir_path}/")
         
         # Check if __init__.py exists
-        if not init_file.exists():
+        if '__init__.py' not in _scan_dir(str(full_path), scan_cache):
             print(f"✗ Missing: {dir_path}/__init__.py")
             with open(init_file, 'w', encoding='utf-8') as f:
                 f.write(init_content)
@@ -59,8 +95,8 @@ def check_and_create_init_files():
     ]
     
     for file_path in key_files:
-        full_path = current_dir / file_path
-        if full_path.exists():
+        parent, name = os.path.split(file_path)
+        if name in _scan_dir(os.path.join(root, parent), scan_cache):
             print(f"✓ Found: {file_path}")
         else:
             print(f"✗ Missing: {file_path}")
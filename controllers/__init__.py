@@ -1,19 +1,67 @@
 # controllers/__init__.py
 """
 Controllers package
-Import order matters to avoid circular imports
+Controllers are imported lazily on first attribute access (PEP 562) so that
+importing the package does not pull in PyQt5, cv2 and the analysis models
 """
+import importlib
 
-# Import base controller first
-from .base_controller import BaseController
+# Map public names to the submodule that defines them
+_lazy_imports = {
+    'BaseController': '.base_controller',
+    'VideoController': '.video_controller',
+    'AnalysisController': '.analysis_controller',
+    'HistoryController': '.history_controller',
+    'MainController': '.main_controller',
+}
 
-# Then import specific controllers
-from .video_controller import VideoController
-from .analysis_controller import AnalysisController
-from .history_controller import HistoryController
 
-# Import main controller last (it uses other controllers)
-from .main_controller import MainController
+def __getattr__(name):
+    """Import controller submodule on first access"""
+    if name not in _lazy_imports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(_lazy_imports[name], __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return list(globals()) + list(_lazy_imports)
+
+
+# Registry: controller modules tự đăng ký khi được import,
+# MainController tra cứu theo tên thay vì import trực tiếp từng module
+_registry = {}
+
+
+def register(name):
+    """
+    Class decorator registering a controller under ``name``
+    
+    Args:
+        name: Registry key, module is expected at ``controllers/<name>_controller.py``
+    """
+    def deco(cls):
+        _registry[name] = cls
+        return cls
+    return deco
+
+
+def get_controller_class(name):
+    """
+    Get a registered controller class, importing its module on first use
+    
+    Args:
+        name: Registry key (e.g. 'video', 'analysis', 'history')
+        
+    Returns:
+        Controller class
+    """
+    if name not in _registry:
+        importlib.import_module(f'.{name}_controller', __name__)
+    return _registry[name]
+
 
 __all__ = [
     'BaseController',
@@ -21,4 +69,4 @@ __all__ = [
     'AnalysisController',
     'HistoryController',
     'MainController'  # MainController ở cuối
-]
\ No newline at end of file
+]
@@ -1,98 +1,115 @@
 """
 Analysis Controller - Điều khiển phân tích TỰ ĐỘNG toàn bộ video
 """
+from __future__ import annotations
 
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
-from typing import Optional, Dict, Any
-import logging
-from pathlib import Path
+from PyQt5.QtCore import pyqtSignal
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, TYPE_CHECKING
+import os
+import threading
 
-from models.video_analysis_orchestrator import (
-    VideoAnalysisOrchestrator, 
-    AnalysisProgress, 
-    RealTimeStats
-)
-from utils.logger import get_logger
+from .base_controller import BaseController
+from . import register
 
-logger = get_logger(__name__)
+if TYPE_CHECKING:
+    # Chỉ dùng cho type hints - tránh import torch/cv2 khi load module
+    from models.video_analysis_orchestrator import AnalysisProgress, RealTimeStats
 
-class AnalysisController(QObject):
+
+@register('analysis')
+class AnalysisController(BaseController):
     """
     Controller để điều khiển quá trình phân tích video TỰ ĐỘNG
     """
     
     # Signals để communicate với View
-    progress_updated = pyqtSignal(dict)  # Tiến trình phân tích
-    stats_updated = pyqtSignal(dict)     # Thống kê real-time
+    progress_updated = pyqtSignal(object)  # AnalysisProgress - tiến trình phân tích
+    stats_updated = pyqtSignal(object)     # RealTimeStats - thống kê real-time
     frame_updated = pyqtSignal(object)   # Frame đã annotated
     analysis_started = pyqtSignal(str)   # Bắt đầu phân tích
     analysis_completed = pyqtSignal(dict) # Hoàn thành phân tích
     analysis_error = pyqtSignal(str)     # Lỗi phân tích
     status_message = pyqtSignal(str)     # Thông báo trạng thái
     
-    def __init__(self):
-        super().__init__()
-        self.model: Optional[VideoAnalysisOrchestrator] = None
-        self.view = None
+    # Signals nội bộ: callbacks của model chạy trên worker thread,
+    # Qt tự queue sang GUI thread khi emit
+    _progress_received = pyqtSignal(object)
+    _stats_received = pyqtSignal(object)
+    _frame_received = pyqtSignal()
+    
+    # (signal trên view, slot trên controller) - thêm signal mới chỉ cần thêm dòng
+    _VIEW_SIGNAL_MAP = (
+        ('start_analysis_requested', 'start_analysis'),
+        ('pause_analysis_requested', 'pause_analysis'),
+        ('resume_analysis_requested', 'resume_analysis'),
+        ('stop_analysis_requested', 'stop_analysis'),
+    )
+    
+    # Template status message, chỉ format lại khi phần trăm (số nguyên) thay đổi
+    _PROGRESS_MESSAGE = 'Đang phân tích: %d%% - Frame %d/%d - FPS: %.1f'
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
         self.current_video_path: Optional[str] = None
+        self._video_name: Optional[str] = None
         self.current_video_id: Optional[int] = None
         
-        # Timer để poll updates từ model
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self._poll_updates)
-        self.update_timer.setInterval(50)  # Update mỗi 50ms cho smooth UI
+        # Coalescing: chỉ giữ frame mới nhất chưa được hiển thị
+        self._pending_lock = threading.Lock()
+        self._pending_frame = None
+        self._flush_scheduled = False
+        self._last_percent_int = -1
+        self._last_stats_key = None
+        # Snapshot read-only của kết quả lần phân tích gần nhất
+        self.current_results: Optional[Mapping[str, Any]] = None
         
-        logger.debug("AnalysisController initialized")
-    
-    def set_model(self, model: VideoAnalysisOrchestrator):
-        """Set model reference"""
-        self.model = model
-        # Set callbacks
-        self.model.set_callbacks(
-            progress_callback=self._on_progress_update,
-            stats_callback=self._on_stats_update,
-            frame_callback=self._on_frame_update
-        )
-        logger.debug("Model set for AnalysisController")
+        # Model push updates qua callbacks -> signals (không cần poll)
+        self._progress_received.connect(self._on_progress_update)
+        self._stats_received.connect(self._on_stats_update)
+        self._frame_received.connect(self._on_frame_update)
+        
+        self.logger.debug("AnalysisController initialized")
     
-    def set_view(self, view):
-        """Set view reference"""
-        self.view = view
-        self._connect_view_signals()
-        logger.debug("View set for AnalysisController")
+    def _connect_model_callbacks(self):
+        """Đăng ký callbacks với orchestrator (gọi từ BaseController.set_model)"""
+        if self._model:
+            self._model.set_callbacks(
+                progress_callback=self._queue_progress,
+                stats_callback=self._queue_stats,
+                frame_callback=self._queue_frame
+            )
     
     def _connect_view_signals(self):
         """Kết nối signals từ view"""
-        if hasattr(self.view, 'start_analysis_requested'):
-            self.view.start_analysis_requested.connect(self.start_analysis)
-        if hasattr(self.view, 'pause_analysis_requested'):
-            self.view.pause_analysis_requested.connect(self.pause_analysis)
-        if hasattr(self.view, 'resume_analysis_requested'):
-            self.view.resume_analysis_requested.connect(self.resume_analysis)
-        if hasattr(self.view, 'stop_analysis_requested'):
-            self.view.stop_analysis_requested.connect(self.stop_analysis)
+        for sig_name, slot_name in self._VIEW_SIGNAL_MAP:
+            sig = getattr(self._view, sig_name, None)
+            if sig is not None:
+                sig.connect(getattr(self, slot_name))
     
     def load_video(self, video_path: str):
         """Load video để chuẩn bị phân tích"""
         try:
-            if not Path(video_path).exists():
+            # Một lần stat() duy nhất, không cần dựng Path
+            if not os.path.isfile(video_path):
                 raise FileNotFoundError(f"Video file not found: {video_path}")
             
             self.current_video_path = video_path
-            self.status_message.emit(f"Đã tải video: {Path(video_path).name}")
-            logger.info(f"Video loaded: {video_path}")
+            self._video_name = os.path.basename(video_path)
+            self.status_message.emit(f"Đã tải video: {self._video_name}")
+            self.logger.info("Video loaded: %s", video_path)
             
         except Exception as e:
             error_msg = f"Lỗi tải video: {str(e)}"
             self.analysis_error.emit(error_msg)
-            logger.error(error_msg)
+            self.logger.error(error_msg)
     
     def start_analysis(self):
         """
         BẮT ĐẦU PHÂN TÍCH TỰ ĐỘNG TOÀN BỘ VIDEO
         Khi người dùng nhấn nút Start, hệ thống sẽ tự động xử lý toàn bộ video
         """
-        if not self.model:
+        if not self._model:
             self.analysis_error.emit("Model chưa được khởi tạo")
             return
         
@@ -100,146 +117,158 @@ class AnalysisController(QObject):
             self.analysis_error.emit("Chưa chọn video để phân tích")
             return
         
-        if self.model.is_processing():
+        if self._model.is_processing():
             self.status_message.emit("Đang có phân tích khác đang chạy")
             return
         
         try:
             # Emit signal bắt đầu phân tích
             self.analysis_started.emit(self.current_video_path)
-            self.status_message.emit("Đang bắt đầu phân tích tự động...")
+            self.status_message.emit(f"Đang bắt đầu phân tích tự động: {self._video_name}")
             
             # Start automatic analysis của TOÀN BỘ VIDEO
-            self.current_video_id = self.model.start_full_video_analysis(
+            self.current_video_id = self._model.start_full_video_analysis(
                 self.current_video_path
             )
             
             if self.current_video_id > 0:
-                # Start timer để poll updates
-                self.update_timer.start()
+                self.current_results = None
+                self._last_percent_int = -1
+                self._last_stats_key = None
                 self.status_message.emit("Đang phân tích video... Vui lòng đợi")
-                logger.info(f"Started automatic analysis for video ID: {self.current_video_id}")
+                self.logger.info("Started automatic analysis for video ID: %s", self.current_video_id)
             else:
                 raise Exception("Failed to start analysis")
             
         except Exception as e:
             error_msg = f"Lỗi khi bắt đầu phân tích: {str(e)}"
             self.analysis_error.emit(error_msg)
-            logger.error(error_msg)
+            self.logger.error(error_msg)
     
     def pause_analysis(self):
         """Tạm dừng phân tích"""
-        if self.model and self.model.is_processing():
-            self.model.pause_analysis()
+        if self._model and self._model.is_processing():
+            self._model.pause_analysis()
             self.status_message.emit("Đã tạm dừng phân tích")
-            logger.info("Analysis paused")
+            self.logger.info("Analysis paused")
     
     def resume_analysis(self):
         """Tiếp tục phân tích"""
-        if self.model and self.model.is_processing():
-            self.model.resume_analysis()
+        if self._model and self._model.is_processing():
+            self._model.resume_analysis()
             self.status_message.emit("Tiếp tục phân tích...")
-            logger.info("Analysis resumed")
+            self.logger.info("Analysis resumed")
     
     def stop_analysis(self):
         """Dừng phân tích hoàn toàn"""
-        if self.model and self.model.is_processing():
-            self.model.stop_analysis()
-            self.update_timer.stop()
+        if self._model and self._model.is_processing():
+            self._model.stop_analysis()
             self.status_message.emit("Đã dừng phân tích")
-            logger.info("Analysis stopped")
+            self.logger.info("Analysis stopped")
     
-    def _poll_updates(self):
-        """Poll updates từ model (chạy theo timer)"""
-        if not self.model:
-            return
-        
-        # Get progress update
-        progress = self.model.get_current_progress()
-        if progress:
-            self._on_progress_update(progress)
-        
-        # Get stats update
-        stats = self.model.get_current_stats()
-        if stats:
-            self._on_stats_update(stats)
-        
-        # Get frame update
-        frame = self.model.get_current_frame()
-        if frame is not None:
-            self._on_frame_update(frame)
+    def _queue_progress(self, progress: AnalysisProgress):
+        """
+        Callback từ worker thread - orchestrator đã giới hạn tần suất
+        (UI_UPDATE_INTERVAL) nên chuyển tiếp mọi cập nhật
+        """
+        self._progress_received.emit(progress)
+    
+    def _queue_stats(self, stats: RealTimeStats):
+        """Callback từ worker thread - đã được orchestrator giới hạn tần suất"""
+        self._stats_received.emit(stats)
+    
+    def _queue_frame(self, frame):
+        """
+        Callback từ worker thread - ghi đè frame đang chờ,
+        chỉ đặt lịch flush khi chưa có flush nào đang chờ
+        """
+        with self._pending_lock:
+            self._pending_frame = frame
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        self._frame_received.emit()
     
     def _on_progress_update(self, progress: AnalysisProgress):
         """Xử lý cập nhật tiến trình"""
-        progress_dict = {
-            'current_frame': progress.current_frame,
-            'total_frames': progress.total_frames,
-            'percent_complete': progress.percent_complete,
-            'current_time': progress.current_time,
-            'total_duration': progress.total_duration,
-            'fps': progress.fps,
-            'status': progress.status
-        }
-        
-        self.progress_updated.emit(progress_dict)
+        # Truyền thẳng dataclass (không copy sang dict)
+        self.progress_updated.emit(progress)
         
         # Cập nhật status message
         if progress.status == 'analyzing':
-            msg = f"Đang phân tích: {progress.percent_complete:.1f}% - " \
-                  f"Frame {progress.current_frame}/{progress.total_frames} - " \
-                  f"FPS: {progress.fps:.1f}"
-            self.status_message.emit(msg)
+            p_int = int(progress.percent_complete)
+            if p_int != self._last_percent_int:
+                self._last_percent_int = p_int
+                self.status_message.emit(self._PROGRESS_MESSAGE % (
+                    p_int, progress.current_frame, progress.total_frames, progress.fps
+                ))
         
         elif progress.status == 'completed':
-            self.update_timer.stop()
             self.status_message.emit("Phân tích hoàn tất!")
             self._on_analysis_completed()
         
         elif progress.status == 'error':
-            self.update_timer.stop()
             self.analysis_error.emit("Có lỗi xảy ra trong quá trình phân tích")
     
     def _on_stats_update(self, stats: RealTimeStats):
-        """Xử lý cập nhật thống kê real-time"""
-        stats_dict = {
-            'total_vehicles': stats.total_vehicles,
-            'vehicles_by_type': stats.vehicles_by_type,
-            'current_minute_count': stats.current_minute_count,
-            'anomalies_detected': stats.anomalies_detected,
-            'processing_fps': stats.processing_fps,
-            'video_timestamp': stats.video_timestamp
-        }
-        
-        self.stats_updated.emit(stats_dict)
+        """Xử lý cập nhật thống kê real-time - bỏ qua nếu không có gì thay đổi"""
+        stats_key = (
+            stats.total_vehicles,
+            stats.current_minute_count,
+            stats.anomalies_detected,
+            stats.video_timestamp
+        )
+        if stats_key == self._last_stats_key:
+            return
+        self._last_stats_key = stats_key
+        self.stats_updated.emit(stats)
     
-    def _on_frame_update(self, frame):
-        """Xử lý cập nhật frame"""
-        self.frame_updated.emit(frame)
+    def _on_frame_update(self):
+        """Hiển thị frame mới nhất (chạy trên GUI thread)"""
+        with self._pending_lock:
+            frame = self._pending_frame
+            self._pending_frame = None
+            self._flush_scheduled = False
+        
+        if frame is not None:
+            self.frame_updated.emit(frame)
     
     def _on_analysis_completed(self):
-        """Xử lý khi phân tích hoàn tất"""
-        if not self.model or not self.current_video_id:
+        """Xử lý khi phân tích hoàn tất - truy vấn kết quả trên thread pool"""
+        if not self._model or not self.current_video_id:
             return
         
-        try:
-            # Lấy kết quả phân tích
-            results = self.model.get_analysis_results(self.current_video_id)
-            
-            # Emit signal với kết quả
-            self.analysis_completed.emit(results)
-            
-            # Log summary
-            if 'traffic_statistics' in results:
-                total = results['traffic_statistics'].get('total_vehicles', 0)
-                logger.info(f"Analysis completed. Total vehicles detected: {total}")
-            
-        except Exception as e:
-            logger.error(f"Error getting analysis results: {e}")
+        self._run_in_background(
+            self._model.get_analysis_results, self.current_video_id,
+            on_finished=self._on_results_ready,
+            on_failed=self._on_results_failed
+        )
+    
+    def _on_results_ready(self, results: Dict[str, Any]):
+        """Nhận kết quả phân tích từ thread pool (chạy trên GUI thread)"""
+        if not results:
+            return
+        
+        # Đóng băng kết quả một lần: người đọc sau không query lại DB
+        # và không thể sửa dict dùng chung
+        self.current_results = MappingProxyType(dict(results))
+        
+        # Emit signal với kết quả
+        self.analysis_completed.emit(results)
+        
+        # Log summary
+        if 'traffic_statistics' in results:
+            total = results['traffic_statistics'].get('total_vehicles', 0)
+            self.logger.info("Analysis completed. Total vehicles detected: %s", total)
+    
+    def _on_results_failed(self, error: Exception):
+        """Lỗi khi truy vấn kết quả phân tích"""
+        self.logger.error("Error getting analysis results: %s", error)
     
     def get_current_statistics(self) -> Dict[str, Any]:
         """Lấy thống kê hiện tại"""
-        if self.model:
-            stats = self.model.get_current_stats()
+        if self._model:
+            stats = self._model.get_current_stats()
             if stats:
                 return {
                     'total_vehicles': stats.total_vehicles,
@@ -250,9 +279,11 @@ class AnalysisController(QObject):
                 }
         return {}
     
-    def get_analysis_results(self) -> Dict[str, Any]:
-        """Lấy kết quả phân tích cuối cùng"""
-        if self.model and self.current_video_id:
-            return self.model.get_analysis_results(self.current_video_id)
+    def get_analysis_results(self) -> Mapping[str, Any]:
+        """Lấy kết quả phân tích cuối cùng (dùng snapshot nếu đã có)"""
+        if self.current_results is not None:
+            return self.current_results
+        if self._model and self.current_video_id:
+            return self._model.get_analysis_results(self.current_video_id)
         return {}
         
\ No newline at end of file
@@ -1,7 +1,46 @@
 # controllers/base_controller.py
-from typing import Optional
+from __future__ import annotations
+
+from typing import Callable, Optional
 import logging
-from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from dal.database import db_manager
+
+
+class _TaskSignals(QObject):
+    """Holder signals cho BackgroundTask (QRunnable không phải QObject)"""
+    finished = pyqtSignal(object)  # Kết quả của hàm
+    failed = pyqtSignal(object)    # Exception
+
+
+class BackgroundTask(QRunnable):
+    """
+    Chạy một hàm trên QThreadPool, kết quả được queue về GUI thread qua signals
+    
+    Repository dùng scoped_session nên mỗi thread của pool có session riêng,
+    không dùng chung SQLite handle với GUI thread. Session đó được đóng khi
+    task xong: object trả về GUI thread ở trạng thái detached (chỉ đọc các
+    thuộc tính đã load) và task sau không thấy identity map cũ.
+    """
+    
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = _TaskSignals()
+    
+    def run(self):
+        try:
+            try:
+                result = self.fn(*self.args, **self.kwargs)
+            finally:
+                db_manager.remove_session()
+        except Exception as e:
+            self.signals.failed.emit(e)
+            return
+        self.signals.finished.emit(result)
 
 
 class BaseController(QObject):
@@ -15,22 +54,25 @@ class BaseController(QObject):
     info_message = pyqtSignal(str)   # Info message
     busy_state_changed = pyqtSignal(bool)  # Busy state
     
+    # Logger cho từng class, gán một lần khi định nghĩa class (xem __init_subclass__)
+    logger = logging.getLogger(f"{__name__}.BaseController")
+    
+    def __init_subclass__(cls, **kwargs):
+        """Create one logger per controller class at class-definition time"""
+        super().__init_subclass__(**kwargs)
+        cls.logger = logging.getLogger(f"{cls.__module__}.{cls.__qualname__}")
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
-        # Initialize logger
-        self._setup_logger()
-        
         # Initialize attributes
         self._view = None
         self._model = None
         self._is_busy = False
+        self._busy_tasks = 0  # Số task busy=True đang chạy
         
-    def _setup_logger(self):
-        """Setup logger for this controller"""
-        self.logger = logging.getLogger(
-            f"{self.__class__.__module__}.{self.__class__.__name__}"
-        )
+        # Giữ tham chiếu tới các BackgroundTask đang chạy cho tới khi xong
+        self._tasks = set()
         
     @property
     def view(self):
@@ -52,9 +94,9 @@ class BaseController(QObject):
         self._view = view
         try:
             self._connect_view_signals()
-            self.logger.debug(f"View set for {self.__class__.__name__}")
+            self.logger.debug("View set for %s", self.__class__.__name__)
         except Exception as e:
-            self.logger.error(f"Error connecting view signals: {e}")
+            self.logger.error("Error connecting view signals: %s", e)
     
     def set_model(self, model):
         """
@@ -66,9 +108,9 @@ class BaseController(QObject):
         self._model = model
         try:
             self._connect_model_callbacks()
-            self.logger.debug(f"Model set for {self.__class__.__name__}")
+            self.logger.debug("Model set for %s", self.__class__.__name__)
         except Exception as e:
-            self.logger.error(f"Error connecting model callbacks: {e}")
+            self.logger.error("Error connecting model callbacks: %s", e)
     
     def _connect_view_signals(self):
         """
@@ -98,6 +140,45 @@ class BaseController(QObject):
         self._is_busy = busy
         self.busy_state_changed.emit(busy)
     
+    def _run_in_background(self, fn: Callable, *args,
+                           on_finished: Callable, on_failed: Optional[Callable] = None,
+                           busy: bool = False, **kwargs) -> BackgroundTask:
+        """
+        Chạy fn(*args, **kwargs) trên QThreadPool thay vì GUI thread
+        
+        Args:
+            fn: Hàm chạy trên thread của pool
+            on_finished: Nhận kết quả (chạy trên GUI thread)
+            on_failed: Nhận exception, mặc định _handle_error
+            busy: Tính task vào trạng thái busy - busy cho tới khi mọi task
+                như vậy đều xong
+            
+        Returns:
+            BackgroundTask đã được start
+        """
+        task = BackgroundTask(fn, *args, **kwargs)
+        task.signals.finished.connect(on_finished)
+        task.signals.failed.connect(on_failed or self._handle_error)
+        
+        self._tasks.add(task)
+        if busy:
+            self._busy_tasks += 1
+            if self._busy_tasks == 1:
+                self._set_busy(True)
+        
+        def release(_):
+            self._tasks.discard(task)
+            if busy:
+                self._busy_tasks -= 1
+                if self._busy_tasks == 0:
+                    self._set_busy(False)
+        
+        task.signals.finished.connect(release)
+        task.signals.failed.connect(release)
+        
+        QThreadPool.globalInstance().start(task)
+        return task
+    
     def _handle_error(self, error: Exception, message: str = None):
         """
         Handle error uniformly
@@ -109,7 +190,7 @@ class BaseController(QObject):
         if message is None:
             message = str(error)
         
-        self.logger.error(f"Error in {self.__class__.__name__}: {message}", exc_info=True)
+        self.logger.error("Error in %s: %s", self.__class__.__name__, message, exc_info=True)
         self.error_occurred.emit(message)
     
     def _show_info(self, message: str):
@@ -132,7 +213,7 @@ class BaseController(QObject):
         Cleanup resources
         Override this method in subclasses if needed
         """
-        self.logger.debug(f"Cleaning up {self.__class__.__name__}")
+        self.logger.debug("Cleaning up %s", self.__class__.__name__)
         
         # Clean up view connections
         if self._view:
@@ -1,20 +1,130 @@
 # controllers/history_controller.py
 from typing import List, Dict, Optional
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, QModelIndex, Qt
-from PyQt5.QtWidgets import QMessageBox
-from datetime import datetime
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, QModelIndex, Qt, QTimer
+from PyQt5.QtWidgets import QMessageBox, QTableWidgetItem
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, time
+from functools import lru_cache
+from operator import attrgetter
+from string import Template
+from types import MappingProxyType
+
+import numpy as np
 
 from .base_controller import BaseController
+from . import register
 from models.repositories import (
     VideoRepository, 
     DetectionEventRepository,
     TrafficDataRepository,
-    AnomalyEventRepository
+    AnomalyEventRepository,
+    TIMELINE_DTYPE
 )
 from dal.models import Video
+from models.entities import VideoDetailBundle, VideoSummary, TrafficSummary, AnomalySummary
 from utils import format_duration, format_timestamp
 
 
+# HTML cho tab thông tin / thống kê - dựng một lần khi load module
+_INFO_TPL = Template("""
+<h3>$file_name</h3>
+<p><b>Ngày xử lý:</b> $processing_date</p>
+<p><b>Thời lượng:</b> $duration</p>
+<p><b>Độ phân giải:</b> $resolution</p>
+<p><b>FPS:</b> $fps</p>
+<p><b>Thời gian xử lý:</b> $processing_duration</p>
+""")
+
+_STATS_TPL = Template("""
+<h3>Thống kê giao thông</h3>
+<p><b>Tổng số phương tiện:</b> $total</p>
+<table>
+<tr><td><b>Ô tô:</b></td><td>$car ($car_pct%)</td></tr>
+<tr><td><b>Xe máy:</b></td><td>$motorbike ($motorbike_pct%)</td></tr>
+<tr><td><b>Xe tải:</b></td><td>$truck ($truck_pct%)</td></tr>
+<tr><td><b>Xe buýt:</b></td><td>$bus ($bus_pct%)</td></tr>
+</table>
+<p><b>TB phương tiện/phút:</b> $avg_per_minute</p>
+<p><b>Cao điểm:</b> $peak_minute xe/phút</p>
+<p><b>Mức độ tắc nghẽn:</b> $congestion</p>
+""")
+
+_NO_STATS_HTML = "<p>Chưa có dữ liệu thống kê</p>"
+
+# Bảng dịch hiển thị (read-only, dùng chung)
+_CONGESTION_TR = MappingProxyType({
+    'low': 'Thấp',
+    'medium': 'Trung bình',
+    'high': 'Cao',
+    'very_high': 'Rất cao',
+    'unknown': 'Không xác định'
+})
+
+_ANOMALY_TYPE_TR = MappingProxyType({
+    'pedestrian': 'Người đi bộ',
+    'animal': 'Động vật',
+    'obstacle': 'Vật cản',
+    'stopped_vehicle': 'Xe dừng bất thường'
+})
+
+_SEVERITY_TR = MappingProxyType({
+    'low': 'Thấp',
+    'medium': 'Trung bình',
+    'high': 'Cao',
+    'critical': 'Nghiêm trọng'
+})
+
+
+@contextmanager
+def _bulk_update(widget):
+    """
+    Tắt repaint, signals và sorting của widget trong lúc thêm nhiều dòng,
+    bật lại (và sort một lần) khi xong
+    
+    Args:
+        widget: QTableWidget
+    """
+    sorting = widget.isSortingEnabled()
+    widget.setUpdatesEnabled(False)
+    widget.blockSignals(True)
+    widget.setSortingEnabled(False)
+    try:
+        yield widget
+    finally:
+        widget.setSortingEnabled(sorting)
+        widget.blockSignals(False)
+        widget.setUpdatesEnabled(True)
+
+
+@lru_cache(maxsize=64)
+def _cached_detail_bundle(video_id: int, version_key) -> Optional[VideoDetailBundle]:
+    """
+    Dữ liệu chi tiết của video, cache theo (video_id, version_key)
+    
+    Video đã xử lý xong không còn thay đổi, version_key
+    (processing_timestamp) chỉ đổi khi video được phân tích lại.
+    Bundle chỉ chứa DTO (không giữ ORM object của session worker).
+    Xoá cache bằng _cached_detail_bundle.cache_clear().
+    """
+    video = VideoRepository().get_with_details(video_id)
+    if not video:
+        return None
+    
+    timeline = DetectionEventRepository().get_traffic_flow_array(video_id, 60)
+    timeline.flags.writeable = False  # Dùng chung qua cache
+    return VideoDetailBundle(
+        video=VideoSummary.from_model(video),
+        traffic_data=TrafficSummary.from_model(video.traffic_data) if video.traffic_data else None,
+        timeline=timeline,
+        anomalies=tuple(
+            AnomalySummary.from_model(anomaly)
+            for anomaly in sorted(video.anomaly_events, key=attrgetter('timestamp_in_video'))
+        )
+    )
+
+
+@register('history')
 class HistoryController(BaseController):
     """
     Controller for historical data viewing and management
@@ -24,6 +134,27 @@ class HistoryController(BaseController):
     video_selected = pyqtSignal(int)  # video_id
     data_refreshed = pyqtSignal()
     
+    # Số video mỗi trang của danh sách lịch sử
+    PAGE_SIZE = 50
+    
+    # Chờ người dùng ngừng gõ rồi mới truy vấn lại (ms)
+    SEARCH_DEBOUNCE_MS = 200
+    
+    # Combo box trạng thái -> giá trị Video.status ("Tất cả" = video đã hoàn thành)
+    _STATUS_FILTERS = {
+        'Tất cả': 'completed',
+        'Hoàn thành': 'completed',
+        'Đang xử lý': 'processing',
+        'Lỗi': 'error'
+    }
+    
+    # Tab chi tiết -> hàm hiển thị (tab 0 - thông tin - luôn hiển thị ngay)
+    _TAB_LOADERS = {
+        1: '_load_traffic_statistics',
+        2: '_load_time_data',
+        3: '_load_anomalies'
+    }
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
@@ -35,20 +166,49 @@ class HistoryController(BaseController):
         
         # Current selection
         self.selected_video_id: Optional[int] = None
-        self.video_list: List[Video] = []
+        self.video_list: List[Video] = []  # Các video đã tải, theo thứ tự trang
+        
+        # Pagination: page index -> videos, tổng số video khớp bộ lọc
+        self._pages: Dict[int, List[Video]] = {}
+        self._total_videos = 0
+        self._video_by_id: Dict[int, Video] = {}
+        self._pending_pages = set()  # Các trang đang được truy vấn
+        
+        # HTML đang hiển thị trên từng QTextEdit, tránh setHtml khi không đổi
+        self._shown_html: Dict[str, str] = {}
+        self._list_generation = 0    # Tăng mỗi lần tải lại danh sách
+        
+        # Dữ liệu chi tiết của video đang chọn (dùng lại khi đổi tab)
+        self._detail_bundle: Optional[VideoDetailBundle] = None
+        self._loaded_tabs = set()  # Các tab đã hiển thị dữ liệu của _detail_bundle
+        
+        # Debounce ô tìm kiếm: mỗi phím gõ chỉ khởi động lại timer
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._apply_filters)
         
     def _connect_view_signals(self):
         """Connect history view signals"""
         if self._view:
             # Video list selection
-            self._view.video_list.itemSelectionChanged.connect(
+            self._view.video_list.selectionModel().selectionChanged.connect(
                 self._on_video_selected
             )
             
             # Filter controls
             self._view.date_filter.dateChanged.connect(self._apply_filters)
             self._view.status_filter.currentTextChanged.connect(self._apply_filters)
-            self._view.search_box.textChanged.connect(self._apply_filters)
+            self._view.search_box.textChanged.connect(self._on_search_text_changed)
+            
+            # Click header để sort - truy vấn lại theo thứ tự mới
+            self._view.video_model.sort_requested.connect(self._on_sort_requested)
+            
+            # Tải trang tiếp theo khi cuộn gần cuối danh sách, hoặc khi
+            # danh sách (vd. sau khi resize) không còn cần thanh cuộn
+            scroll_bar = self._view.video_list.verticalScrollBar()
+            scroll_bar.valueChanged.connect(self._on_list_scrolled)
+            scroll_bar.rangeChanged.connect(self._on_list_range_changed)
             
             # Action buttons
             self._view.btn_refresh.clicked.connect(self.refresh_history)
@@ -69,31 +229,142 @@ class HistoryController(BaseController):
     
     @pyqtSlot()
     def refresh_history(self):
-        """Refresh video history list"""
-        try:
-            self._set_busy(True)
-            
-            # Get completed videos
-            self.video_list = self.video_repo.get_completed_videos(include_stats=True)
-            
-            # Update view
-            if self._view:
-                self._view.clear_all()
-                self._populate_video_list()
-            
+        """Refresh video history list - tải lại từ DB, bỏ cache chi tiết"""
+        _cached_detail_bundle.cache_clear()
+        self._reload_list()
+    
+    def _reload_list(self):
+        """Tải lại danh sách video theo bộ lọc hiện tại - chỉ tải trang đầu tiên"""
+        # Kết quả của các truy vấn cũ (bộ lọc trước) sẽ bị bỏ qua
+        self._list_generation += 1
+        self._pending_pages.clear()
+        
+        self._pages.clear()
+        self._video_by_id.clear()
+        self.video_list = []
+        self._total_videos = 0
+        if self._view:
+            self._view.clear_all()
+            self._shown_html.clear()
+        # Danh sách và chi tiết đã bị xoá - không còn video nào được chọn
+        self.selected_video_id = None
+        self._detail_bundle = None
+        self._loaded_tabs.clear()
+        
+        self._load_page(0)
+    
+    def _current_filters(self) -> Dict:
+        """Đọc bộ lọc từ view thành tham số cho truy vấn SQL"""
+        if not self._view:
+            return {}
+        
+        status_text = self._view.status_filter.currentText()
+        order_by, descending = self._view.video_model.sort_key()
+        return {
+            'status': self._STATUS_FILTERS.get(status_text, 'completed'),
+            'search_text': self._view.search_box.text().strip() or None,
+            'since': datetime.combine(self._view.date_filter.date().toPyDate(), time.min),
+            'order_by': order_by,
+            'descending': descending
+        }
+    
+    def _load_page(self, page: int):
+        """
+        Tải một trang video (nếu chưa có) trên thread pool
+        
+        Args:
+            page: Page index, bắt đầu từ 0
+        """
+        if page in self._pages or page in self._pending_pages:
+            return
+        
+        generation = self._list_generation
+        self._pending_pages.add(page)
+        self._run_in_background(
+            self.video_repo.get_completed_videos_page,
+            page * self.PAGE_SIZE, self.PAGE_SIZE,
+            on_finished=lambda result: self._on_page_loaded(generation, page, result),
+            on_failed=lambda error: self._on_page_failed(generation, page, error),
+            busy=True,
+            **self._current_filters()
+        )
+    
+    def _on_page_loaded(self, generation: int, page: int, result):
+        """Nhận một trang video từ thread pool (chạy trên GUI thread)"""
+        if generation != self._list_generation:
+            return
+        self._pending_pages.discard(page)
+        
+        videos, self._total_videos = result
+        self._pages[page] = videos
+        self.video_list.extend(videos)
+        self._video_by_id.update((video.id, video) for video in videos)
+        
+        if self._view:
+            self._populate_video_list(videos)
+            self._fill_viewport()
+        
+        if page == 0:
             self.data_refreshed.emit()
-            self._show_info(f"Đã tải {len(self.video_list)} video")
-            
-        except Exception as e:
-            self._handle_error(e, "Lỗi tải lịch sử")
-        finally:
-            self._set_busy(False)
-    
-    def _populate_video_list(self):
-        """Populate video list in view"""
-        for video in self.video_list:
-            # Format video info
-            info = {
+            self._show_info(f"Đã tải {len(self.video_list)}/{self._total_videos} video")
+    
+    def _on_page_failed(self, generation: int, page: int, error: Exception):
+        """Lỗi khi tải một trang video"""
+        if generation == self._list_generation:
+            self._pending_pages.discard(page)
+        self._handle_error(error, "Lỗi tải lịch sử")
+    
+    @pyqtSlot(str, bool)
+    def _on_sort_requested(self, order_by: str, descending: bool):
+        """Sort danh sách - các trang đã tải theo thứ tự cũ nên tải lại từ trang đầu"""
+        self._reload_list()
+    
+    @pyqtSlot(int)
+    def _on_list_scrolled(self, value: int):
+        """Tải trang tiếp theo khi thanh cuộn tới gần cuối"""
+        scroll_bar = self._view.video_list.verticalScrollBar()
+        if value < scroll_bar.maximum() - scroll_bar.pageStep() // 4:
+            return
+        
+        self._load_next_page()
+    
+    @pyqtSlot(int, int)
+    def _on_list_range_changed(self, minimum: int, maximum: int):
+        """Danh sách vừa đủ chỗ cho mọi dòng đã tải (vd. cửa sổ cao hơn) - tải thêm"""
+        if maximum == 0:
+            self._load_next_page()
+    
+    def _fill_viewport(self):
+        """
+        Tải trang tiếp theo khi các dòng đã tải chưa lấp đầy danh sách
+        
+        Không có thanh cuộn thì valueChanged không bao giờ phát, các trang
+        còn lại sẽ không được tải.
+        """
+        video_list = self._view.video_list
+        # Layout của view bị trì hoãn - cập nhật ngay để đọc đúng range thanh cuộn
+        video_list.doItemsLayout()
+        if video_list.verticalScrollBar().maximum() == 0:
+            self._load_next_page()
+    
+    def _load_next_page(self):
+        """Tải trang kế tiếp nếu vẫn còn video khớp bộ lọc chưa tải"""
+        next_page = len(self._pages)
+        if next_page * self.PAGE_SIZE >= self._total_videos:
+            return
+        
+        self._load_page(next_page)
+    
+    def _populate_video_list(self, videos: Optional[List[Video]] = None):
+        """
+        Populate video list in view
+        
+        Args:
+            videos: Videos to append, mặc định toàn bộ video_list
+        """
+        # Model thêm cả trang một lần, QTreeView chỉ vẽ các dòng đang hiển thị
+        self._view.video_model.append_videos([
+            {
                 'id': video.id,
                 'file_name': video.file_name,
                 'processing_date': format_timestamp(video.processing_timestamp),
@@ -101,20 +372,19 @@ class HistoryController(BaseController):
                 'total_vehicles': video.traffic_data.total_vehicles if video.traffic_data else 0,
                 'status': video.status
             }
-            
-            self._view.add_video_item(info)
+            for video in (self.video_list if videos is None else videos)
+        ])
     
     @pyqtSlot()
     def _on_video_selected(self):
         """Handle video selection"""
         try:
-            selected_items = self._view.video_list.selectedItems()
-            if not selected_items:
+            selected_rows = self._view.video_list.selectionModel().selectedRows()
+            if not selected_rows:
                 return
             
-            # Get video ID from item data
-            item = selected_items[0]
-            video_id = item.data(0, 1)  # Role 1 stores ID
+            # Get video ID from model row
+            video_id = self._view.video_model.video_id(selected_rows[0].row())
             
             if video_id != self.selected_video_id:
                 self.selected_video_id = video_id
@@ -125,157 +395,155 @@ class HistoryController(BaseController):
             self._handle_error(e, "Lỗi chọn video")
     
     def _load_video_details(self, video_id: int):
-        """Load details for selected video"""
+        """Load details for selected video - truy vấn trên thread pool"""
+        video = self._video_by_id.get(video_id)
+        version_key = video.processing_timestamp if video else None
+        self._run_in_background(
+            _cached_detail_bundle, video_id, version_key,
+            on_finished=lambda bundle: self._on_details_loaded(video_id, bundle),
+            on_failed=lambda error: self._handle_error(error, "Lỗi tải chi tiết video")
+        )
+    
+    def _on_details_loaded(self, video_id: int, bundle: Optional[VideoDetailBundle]):
+        """Hiển thị chi tiết video (GUI thread), bỏ qua nếu đã chọn video khác"""
+        if video_id != self.selected_video_id:
+            return
+        
         try:
-            # Get video with all data
-            video = self.video_repo.get_with_all_data(video_id)
-            if not video:
+            self._detail_bundle = bundle
+            self._loaded_tabs = {0}
+            if not bundle:
                 return
+            video = bundle.video
             
             # Update info tab
             if self._view:
-                info_text = f"""
-                <h3>{video.file_name}</h3>
-                <p><b>Ngày xử lý:</b> {format_timestamp(video.processing_timestamp)}</p>
-                <p><b>Thời lượng:</b> {format_duration(video.duration)}</p>
-                <p><b>Độ phân giải:</b> {video.resolution}</p>
-                <p><b>FPS:</b> {video.fps}</p>
-                <p><b>Thời gian xử lý:</b> {format_duration(video.processing_duration) if video.processing_duration else 'N/A'}</p>
-                """
-                self._view.info_display.setHtml(info_text)
-            
-            # Load traffic statistics
-            self._load_traffic_statistics(video_id)
-            
-            # Load time-based data
-            self._load_time_data(video_id)
+                self._set_html('info_display', _INFO_TPL.substitute(
+                    file_name=video.file_name,
+                    processing_date=format_timestamp(video.processing_timestamp),
+                    duration=format_duration(video.duration),
+                    resolution=video.resolution,
+                    fps=video.fps,
+                    processing_duration=format_duration(video.processing_duration) if video.processing_duration else 'N/A'
+                ))
             
-            # Load anomalies
-            self._load_anomalies(video_id)
+            # Chỉ hiển thị tab đang mở, các tab khác hiển thị khi được chọn
+            if self._view:
+                self._render_tab(self._view.tab_widget.currentIndex())
             
         except Exception as e:
             self._handle_error(e, "Lỗi tải chi tiết video")
     
-# Trong HistoryController._load_traffic_statistics, sửa phần format string:
-
-    def _load_traffic_statistics(self, video_id: int):
+    def _load_traffic_statistics(self, bundle: VideoDetailBundle):
         """Load traffic statistics for selected video"""
         try:
-            # Get traffic data
-            traffic_data = self.traffic_repo.get_by_video_id(video_id)
+            traffic_data = bundle.traffic_data
             
             if self._view and traffic_data:
-                # Calculate percentages với giá trị mặc định
-                total = traffic_data.total_vehicles or 0
-                car_count = traffic_data.car_count or 0
-                motorbike_count = traffic_data.motorbike_count or 0
-                truck_count = traffic_data.truck_count or 0
-                bus_count = traffic_data.bus_count or 0
-                
-                car_pct = (car_count / total * 100) if total > 0 else 0
-                motorbike_pct = (motorbike_count / total * 100) if total > 0 else 0
-                truck_pct = (truck_count / total * 100) if total > 0 else 0
-                bus_pct = (bus_count / total * 100) if total > 0 else 0
-                
-                # Create stats dictionary
-                stats = {
-                    'total_vehicles': total,
-                    'vehicle_breakdown': {
-                        'car': car_count,
-                        'motorbike': motorbike_count,
-                        'truck': truck_count,
-                        'bus': bus_count
-                    },
-                    'car_percentage': car_pct,
-                    'motorbike_percentage': motorbike_pct,
-                    'truck_percentage': truck_pct,
-                    'bus_percentage': bus_pct,
-                    'avg_per_minute': 0,  # Calculate if needed
-                    'peak_minute': 0,
-                    'congestion_level': traffic_data.congestion_level or 'unknown'
-                }
+                # Phần trăm đã được tính sẵn trong SQL (TrafficData.*_pct)
+                pct = traffic_data.percentages
                 
-                # Format HTML
-                stats_html = f"""
-                <h3>Thống kê giao thông</h3>
-                <p><b>Tổng số phương tiện:</b> {stats['total_vehicles']}</p>
-                <table>
-                <tr><td><b>Ô tô:</b></td><td>{stats['vehicle_breakdown']['car']} ({stats['car_percentage']:.1f}%)</td></tr>
-                <tr><td><b>Xe máy:</b></td><td>{stats['vehicle_breakdown']['motorbike']} ({stats['motorbike_percentage']:.1f}%)</td></tr>
-                <tr><td><b>Xe tải:</b></td><td>{stats['vehicle_breakdown']['truck']} ({stats['truck_percentage']:.1f}%)</td></tr>
-                <tr><td><b>Xe buýt:</b></td><td>{stats['vehicle_breakdown']['bus']} ({stats['bus_percentage']:.1f}%)</td></tr>
-                </table>
-                <p><b>TB phương tiện/phút:</b> {stats.get('avg_per_minute', 0):.1f}</p>
-                <p><b>Cao điểm:</b> {stats.get('peak_minute', 0)} xe/phút</p>
-                <p><b>Mức độ tắc nghẽn:</b> {self._translate_congestion(stats.get('congestion_level', 'unknown'))}</p>
-                """
-                
-                self._view.stats_display.setHtml(stats_html)
-            else:
+                self._set_html('stats_display', _STATS_TPL.substitute(
+                    total=traffic_data.total_vehicles,
+                    car=traffic_data.car_count,
+                    car_pct=f"{pct['car']:.1f}",
+                    motorbike=traffic_data.motorbike_count,
+                    motorbike_pct=f"{pct['motorbike']:.1f}",
+                    truck=traffic_data.truck_count,
+                    truck_pct=f"{pct['truck']:.1f}",
+                    bus=traffic_data.bus_count,
+                    bus_pct=f"{pct['bus']:.1f}",
+                    avg_per_minute="0.0",  # Calculate if needed
+                    peak_minute=0,
+                    congestion=self._translate_congestion(traffic_data.congestion_level or 'unknown')
+                ))
+            elif self._view:
                 # No data case
-                self._view.stats_display.setHtml("<p>Chưa có dữ liệu thống kê</p>")
+                self._set_html('stats_display', _NO_STATS_HTML)
                 
         except Exception as e:
             self._handle_error(e, "Lỗi tải thống kê")
     
-    def _load_time_data(self, video_id: int):
+    def _set_html(self, display_name: str, html: str):
+        """
+        setHtml cho QTextEdit của view, bỏ qua nếu nội dung không đổi
+        (setHtml bắt QTextDocument parse lại toàn bộ)
+        
+        Args:
+            display_name: Tên thuộc tính trên view ('info_display', 'stats_display')
+            html: Nội dung HTML
+        """
+        if self._shown_html.get(display_name) == html:
+            return
+        self._shown_html[display_name] = html
+        getattr(self._view, display_name).setHtml(html)
+    
+    def _load_time_data(self, bundle: VideoDetailBundle):
         """Load time-based traffic data"""
         try:
-            # Get timeline data (FR3.2.5)
-            timeline = self.detection_repo.get_traffic_flow_timeline(video_id, 60)
+            # Timeline data (FR3.2.5) - structured array, đọc theo cột
+            timeline = bundle.timeline
+            if timeline is None:
+                timeline = np.zeros(0, dtype=TIMELINE_DTYPE)
             
             if self._view:
                 self._view.time_table.clearContents()
-                self._view.time_table.setRowCount(len(timeline))
+                self._view.time_table.setRowCount(timeline.size)
                 
-                for row, entry in enumerate(timeline):
-                    # Minute
-                    self._view.time_table.setItem(row, 0, 
-                        self._create_table_item(str(entry['interval'])))
-                    
-                    # Time range
-                    time_range = f"{format_duration(entry['start_time'])} - {format_duration(entry['end_time'])}"
-                    self._view.time_table.setItem(row, 1,
-                        self._create_table_item(time_range))
-                    
-                    # Vehicle counts
-                    counts = entry['counts']
-                    self._view.time_table.setItem(row, 2,
-                        self._create_table_item(str(counts.get('car', 0))))
-                    self._view.time_table.setItem(row, 3,
-                        self._create_table_item(str(counts.get('motorbike', 0))))
-                    self._view.time_table.setItem(row, 4,
-                        self._create_table_item(str(counts.get('truck', 0))))
-                    self._view.time_table.setItem(row, 5,
-                        self._create_table_item(str(counts.get('bus', 0))))
-                    
-                    # Total
-                    self._view.time_table.setItem(row, 6,
-                        self._create_table_item(str(entry['total'])))
+                # tolist() đổi cả cột sang int/float Python một lần
+                columns = zip(
+                    timeline['interval'].tolist(), timeline['start'].tolist(),
+                    timeline['end'].tolist(), timeline['car'].tolist(),
+                    timeline['motorbike'].tolist(), timeline['truck'].tolist(),
+                    timeline['bus'].tolist(), timeline['total'].tolist()
+                )
+                
+                # Bind method ra biến local trước vòng lặp
+                make_item = self._create_table_item
+                set_item = self._view.time_table.setItem
+                
+                # Sorting phải tắt khi setItem, nếu không dòng bị sắp xếp lại giữa chừng
+                with _bulk_update(self._view.time_table):
+                    for row, (interval, start, end, car, motorbike, truck, bus, total) in enumerate(columns):
+                        # Minute, time range, vehicle counts, total
+                        cells = (
+                            str(interval),
+                            f"{format_duration(start)} - {format_duration(end)}",
+                            str(car), str(motorbike), str(truck), str(bus),
+                            str(total)
+                        )
+                        for col, text in enumerate(cells):
+                            set_item(row, col, make_item(text))
                 
-                # Find and highlight peak minute
-                peak = self.detection_repo.get_peak_traffic_interval(video_id)
-                if peak:
+                # Find and highlight peak minute - argmax trên timeline đã tải
+                if timeline.size:
+                    peak = timeline[np.argmax(timeline['total'])]
                     self._view.lbl_peak_time.setText(
                         f"Thời điểm cao điểm: Phút {peak['interval']} ({peak['total']} xe)"
                     )
+                else:
+                    self._view.lbl_peak_time.setText("Thời điểm cao điểm: --")
                     
         except Exception as e:
             self._handle_error(e, "Lỗi tải dữ liệu theo thời gian")
     
-    def _load_anomalies(self, video_id: int):
+    def _load_anomalies(self, bundle: VideoDetailBundle):
         """Load anomaly events"""
         try:
-            anomalies = self.anomaly_repo.get_anomalies_for_video(video_id)
+            anomalies = bundle.anomalies
             
             if self._view:
                 self._view.anomaly_list.clear()
                 
+                # Bind lookup ra biến local trước vòng lặp
+                type_tr = _ANOMALY_TYPE_TR.get
+                severity_tr = _SEVERITY_TR.get
+                
                 for anomaly in anomalies:
                     # Format anomaly info
                     time_str = format_duration(anomaly.timestamp_in_video)
-                    type_str = self._translate_anomaly_type(anomaly.anomaly_type)
-                    severity_str = self._translate_severity(anomaly.severity_level)
+                    type_str = type_tr(anomaly.anomaly_type, anomaly.anomaly_type)
+                    severity_str = severity_tr(anomaly.severity_level, anomaly.severity_level)
                     
                     item_text = f"[{time_str}] {type_str} - {severity_str}"
                     if anomaly.alert_message:
@@ -283,53 +551,28 @@ class HistoryController(BaseController):
                     
                     self._view.add_anomaly_item(item_text, anomaly.severity_level)
                 
-                # Update summary
-                counts = self.anomaly_repo.count_by_type_and_severity(video_id)
-                self._view.lbl_anomaly_summary.setText(
-                    f"Tổng cộng: {len(anomalies)} bất thường"
-                )
+                # Update summary - đếm theo loại trên danh sách đã tải, không truy vấn lại
+                type_counts = Counter(anomaly.anomaly_type for anomaly in anomalies)
+                summary = f"Tổng cộng: {len(anomalies)} bất thường"
+                if type_counts:
+                    summary += " (" + ", ".join(
+                        f"{type_tr(atype, atype)}: {count}"
+                        for atype, count in type_counts.most_common()
+                    ) + ")"
+                self._view.lbl_anomaly_summary.setText(summary)
                 
         except Exception as e:
             self._handle_error(e, "Lỗi tải danh sách bất thường")
     
+    @pyqtSlot(str)
+    def _on_search_text_changed(self, text: str):
+        """Khởi động lại debounce timer, lọc khi ngừng gõ SEARCH_DEBOUNCE_MS"""
+        self._search_timer.start()
+    
     @pyqtSlot()
     def _apply_filters(self):
-        """Apply filters to video list"""
-        try:
-            # Get filter values
-            search_text = self._view.search_box.text().lower()
-            status_filter = self._view.status_filter.currentText()
-            date_filter = self._view.date_filter.date().toPyDate()
-            
-            # Filter video list
-            for i in range(self._view.video_list.topLevelItemCount()):
-                item = self._view.video_list.topLevelItem(i)
-                video_id = item.data(0, 1)
-                
-                # Find video in list
-                video = next((v for v in self.video_list if v.id == video_id), None)
-                if not video:
-                    continue
-                
-                # Apply filters
-                show = True
-                
-                # Search filter
-                if search_text and search_text not in video.file_name.lower():
-                    show = False
-                
-                # Status filter
-                if status_filter != "Tất cả" and video.status != status_filter.lower():
-                    show = False
-                
-                # Date filter
-                if video.processing_timestamp.date() < date_filter:
-                    show = False
-                
-                item.setHidden(not show)
-                
-        except Exception as e:
-            self._handle_error(e, "Lỗi áp dụng bộ lọc")
+        """Apply filters to video list - lọc trong SQL, tải lại từ trang đầu"""
+        self._reload_list()
     
     @pyqtSlot()
     def _delete_selected(self):
@@ -352,6 +595,8 @@ class HistoryController(BaseController):
         if reply == QMessageBox.Yes:
             try:
                 self.video_repo.delete(self.selected_video_id)
+                # VideoRepository.delete đã xoá cache timeline - bỏ chi tiết đã cache
+                _cached_detail_bundle.cache_clear()
                 self._show_info("Đã xóa video thành công")
                 self.refresh_history()
             except Exception as e:
@@ -370,14 +615,23 @@ class HistoryController(BaseController):
     @pyqtSlot(int)
     def _on_tab_changed(self, index: int):
         """Handle tab change"""
-        # Refresh data for new tab if needed
         if self.selected_video_id:
-            if index == 1:  # Statistics tab
-                self._load_traffic_statistics(self.selected_video_id)
-            elif index == 2:  # Time data tab
-                self._load_time_data(self.selected_video_id)
-            elif index == 3:  # Anomalies tab
-                self._load_anomalies(self.selected_video_id)
+            self._render_tab(index)
+    
+    def _render_tab(self, index: int):
+        """
+        Hiển thị dữ liệu của video đang chọn lên tab, bỏ qua nếu tab đã hiển thị
+        
+        Args:
+            index: Tab index
+        """
+        loader = self._TAB_LOADERS.get(index)
+        bundle = self._detail_bundle
+        if loader is None or bundle is None or index in self._loaded_tabs:
+            return
+        
+        getattr(self, loader)(bundle)
+        self._loaded_tabs.add(index)
     
     def toggle_history_view(self):
         """Toggle history view visibility"""
@@ -388,46 +642,29 @@ class HistoryController(BaseController):
     
     def _create_table_item(self, text: str):
         """Create table widget item"""
-        from PyQt5.QtWidgets import QTableWidgetItem
-        from PyQt5.QtCore import Qt
-        
         item = QTableWidgetItem(text)
         item.setTextAlignment(Qt.AlignCenter)
         return item
     
     def _translate_congestion(self, level: str) -> str:
         """Translate congestion level"""
-        translations = {
-            'low': 'Thấp',
-            'medium': 'Trung bình',
-            'high': 'Cao',
-            'very_high': 'Rất cao',
-            'unknown': 'Không xác định'
-        }
-        return translations.get(level, level)
+        return _CONGESTION_TR.get(level, level)
     
     def _translate_anomaly_type(self, atype: str) -> str:
         """Translate anomaly type"""
-        translations = {
-            'pedestrian': 'Người đi bộ',
-            'animal': 'Động vật',
-            'obstacle': 'Vật cản',
-            'stopped_vehicle': 'Xe dừng bất thường'
-        }
-        return translations.get(atype, atype)
+        return _ANOMALY_TYPE_TR.get(atype, atype)
     
     def _translate_severity(self, severity: str) -> str:
         """Translate severity level"""
-        translations = {
-            'low': 'Thấp',
-            'medium': 'Trung bình',
-            'high': 'Cao',
-            'critical': 'Nghiêm trọng'
-        }
-        return translations.get(severity, severity)
+        return _SEVERITY_TR.get(severity, severity)
     
     def cleanup(self):
         """Cleanup resources"""
+        self._search_timer.stop()
         self.selected_video_id = None
+        self._detail_bundle = None
+        self._loaded_tabs.clear()
         self.video_list.clear()
+        self._pages.clear()
+        self._video_by_id.clear()
         super().cleanup()
\ No newline at end of file
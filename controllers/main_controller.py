@@ -6,10 +6,7 @@ from PyQt5.QtCore import QObject, pyqtSignal
 import logging
 from typing import Optional
 
-from .base_controller import BaseController
-from controllers.video_controller import VideoController
-from controllers.analysis_controller import AnalysisController
-from controllers.history_controller import HistoryController
+from controllers import get_controller_class
 from models.video_analysis_orchestrator import VideoAnalysisOrchestrator
 from dal.database import db_manager
 from utils.config_manager import config_manager
@@ -29,10 +26,10 @@ class MainController(QObject):
     def __init__(self):
         super().__init__()
         
-        # Initialize sub-controllers
-        self.video_controller = VideoController()
-        self.analysis_controller = AnalysisController()
-        self.history_controller = HistoryController()
+        # Initialize sub-controllers (tra cứu qua registry, không phụ thuộc thứ tự import)
+        self.video_controller = get_controller_class('video')()
+        self.analysis_controller = get_controller_class('analysis')()
+        self.history_controller = get_controller_class('history')()
 
         # Initialize configuration
         self.config = config_manager.load_config()
@@ -71,10 +68,8 @@ class MainController(QObject):
     
     def _connect_internal_signals(self):
         """Kết nối signals giữa các controllers"""
-        # Video controller -> Analysis controller
-        self.video_controller.video_loaded.connect(
-            self.analysis_controller.load_video
-        )
+        # Analysis controller nhận video duy nhất qua video_player.video_loaded
+        # (_on_video_loaded_in_view), không nối thêm từ video_controller
         
         # Analysis controller signals
         self.analysis_controller.analysis_error.connect(
@@ -115,6 +110,9 @@ class MainController(QObject):
         # Connect main window signals
         main_window.closing.connect(self._on_app_closing)
         
+        # Lỗi video (load/playback) hiển thị bằng hộp thoại không modal
+        self.video_controller.error_occurred.connect(main_window.show_error)
+        
         # Connect analysis signals to main window
         self.analysis_controller.progress_updated.connect(
             main_window.on_progress_updated
@@ -1,63 +1,129 @@
 # controllers/video_controller.py
-from typing import Optional
+from typing import Optional, Tuple
+from collections import deque
 from pathlib import Path
-from PyQt5.QtCore import pyqtSignal, QTimer, QThread, pyqtSlot, QMutex, QMutexLocker
-from PyQt5.QtWidgets import QFileDialog, QMessageBox
+from PyQt5.QtCore import pyqtSignal, QTimer, QThread, pyqtSlot, QMutex, QMutexLocker, QWaitCondition, Qt, QSignalBlocker
+from PyQt5.QtWidgets import QFileDialog
 import cv2
 import numpy as np
 import time
+import math
 import logging
+import threading
 
 from .base_controller import BaseController
-from utils import is_video_file, get_video_info, format_duration
+from . import register
+from utils import is_video_file, get_video_info, format_duration, config_manager, pin_current_thread
 from models.entities import VideoInfo, ProcessingState
 
 
 class VideoPlaybackThread(QThread):
     """
     Safe video playback thread with proper error handling
+    
+    Thread decode theo tốc độ video và đẩy frame vào hàng đợi nhỏ; GUI lấy
+    frame mới nhất bằng take_latest(), frame cũ bị bỏ khi GUI không kịp.
     """
-    frame_ready = pyqtSignal(np.ndarray, int, float)  # frame, frame_id, timestamp
     playback_finished = pyqtSignal()
     error_occurred = pyqtSignal(str)  # error message
     
+    # Số frame tối đa chờ GUI lấy (đầy thì bỏ frame cũ nhất)
+    FRAME_QUEUE_SIZE = 3
+    
+    # Số buffer xoay vòng: frame được decode thẳng vào buffer, không copy.
+    # Nơi nhận frame từ take_latest() phải coi frame là read-only và không giữ
+    # lại sau khi xử lý xong - buffer sẽ bị ghi đè sau RING_SIZE frame.
+    RING_SIZE = 6
+    
+    # Giới hạn mỗi lần ngủ (s) và ngưỡng dưới đó không ngủ (s)
+    MAX_SLEEP = 0.100
+    MIN_SLEEP = 0.002
+    
+    # Thời gian chờ run() thoát khi stop() (ms)
+    STOP_TIMEOUT_MS = 10000
+    
     def __init__(self):
         super().__init__()
         self.video_processor = None
         self.orchestrator = None
         self.is_playing = False
-        self.should_stop = False
+        self._stop_event = threading.Event()  # Cancel token - run() tự thoát, không terminate()
         self.target_fps = 30
+        self.max_playback_fps = 60  # Giới hạn FPS phát (nguồn 120fps vẫn phát tối đa 60)
         self.mutex = QMutex()
-        self.last_frame_time = 0
+        self._state_changed = QWaitCondition()  # Đánh thức run() khi play/stop
+        self._ring = []
+        self._frames = deque(maxlen=self.FRAME_QUEUE_SIZE)  # (frame, frame_id, timestamp)
+        self.dropped_frames = 0  # Số frame bị bỏ vì GUI không kịp hiển thị
+
+    @property
+    def should_stop(self) -> bool:
+        """True khi đã yêu cầu dừng phát"""
+        return self._stop_event.is_set()
 
     def set_orchestrator(self, orchestrator):
         self.orchestrator = orchestrator
         
     def set_video_processor(self, processor):
-        with QMutexLocker(self.mutex):
-            self.video_processor = processor
+        # Gán thuộc tính là atomic trên CPython; run() chỉ đọc processor một lần
+        # khi bắt đầu phát nên không cần mutex (đổi video luôn stop() trước)
+        self.video_processor = processor
         
     def play(self):
         with QMutexLocker(self.mutex):
             self.is_playing = True
-            self.should_stop = False
+            self._stop_event.clear()
+            self._state_changed.wakeAll()
         
     def pause(self):
         with QMutexLocker(self.mutex):
             self.is_playing = False
+            self._state_changed.wakeAll()
         
     def stop(self):
         with QMutexLocker(self.mutex):
-            self.should_stop = True
+            self._stop_event.set()
             self.is_playing = False
+            self._state_changed.wakeAll()
         
-        # Wait for thread to finish
+        # Wait for thread to finish - run() kiểm tra cancel token trước/sau mỗi
+        # lần đọc frame và trong lúc ngủ, không dùng terminate() (có thể để lại
+        # lock/buffer/trạng thái OpenCV dở dang)
         if self.isRunning():
             self.quit()
-            if not self.wait(5000):  # 5 second timeout
-                self.terminate()
-                self.wait()
+            if not self.wait(self.STOP_TIMEOUT_MS):
+                logging.getLogger(__name__).warning(
+                    f"Playback thread did not stop within {self.STOP_TIMEOUT_MS} ms")
+        
+        with QMutexLocker(self.mutex):
+            self._frames.clear()
+    
+    def playback_fps(self, fps: Optional[float]) -> float:
+        """
+        FPS phát thực tế cho FPS báo bởi container
+        
+        Args:
+            fps: FPS của video (0/None với VFR hoặc header hỏng)
+            
+        Returns:
+            FPS trong khoảng [1, max_playback_fps], mặc định 30
+        """
+        return min(max(fps or 30.0, 1.0), self.max_playback_fps)
+    
+    def take_latest(self) -> Optional[Tuple[np.ndarray, int, float]]:
+        """
+        Lấy frame mới nhất đang chờ (gọi từ GUI thread), bỏ các frame cũ hơn
+        
+        Returns:
+            (frame, frame_id, timestamp) or None if no new frame
+        """
+        with QMutexLocker(self.mutex):
+            if not self._frames:
+                return None
+            self.dropped_frames += len(self._frames) - 1
+            entry = self._frames[-1]
+            self._frames.clear()
+            return entry
         
     def run(self):
         """Safe playback loop with frame timing"""
@@ -66,52 +132,110 @@ class VideoPlaybackThread(QThread):
                 self.error_occurred.emit("No video processor set")
                 return
             
+            # Giữ decode trên cố định một nhóm core (tùy chọn, Linux)
+            cpus = config_manager.get('video_processing.playback_cpu_affinity')
+            try:
+                pin_current_thread(cpus)
+            except (OSError, ValueError) as e:
+                logging.getLogger(__name__).warning(f"Could not set playback CPU affinity {cpus}: {e}")
+            
             # Get actual FPS from video
+            source_fps = self.target_fps
             if self.video_processor.video_info:
-                self.target_fps = self.video_processor.video_info.fps
+                source_fps = self.video_processor.video_info.fps or source_fps
+            
+            # Nguồn nhanh hơn max_playback_fps: chỉ decode 1 trên mỗi `skip` frame
+            # (grab bỏ qua phần chuyển màu) để vẫn phát đúng thời gian thực
+            skip = max(1, math.ceil(source_fps / self.playback_fps(source_fps) - 1e-6))
+            self.target_fps = source_fps / skip
             
             frame_interval = 1.0 / self.target_fps  # seconds
             
+            # Cấp phát ring buffer theo kích thước video
+            video_info = self.video_processor.video_info
+            if video_info:
+                shape = (video_info.height, video_info.width, 3)
+                if not self._ring or self._ring[0].shape != shape:
+                    self._ring = [np.empty(shape, dtype=np.uint8) for _ in range(self.RING_SIZE)]
+            ring_index = 0
+            self.dropped_frames = 0
+            
+            # Biến cục bộ cho vòng lặp per-frame (tránh tra thuộc tính self.x mỗi frame)
+            mutex = self.mutex
+            stop_event = self._stop_event
+            state_changed = self._state_changed
+            read_frame_into = self.video_processor.read_frame_into
+            grab_frames = self.video_processor.grab_frames
+            frames = self._frames
+            ring = self._ring
+            ring_size = len(ring)
+            queue_size = self.FRAME_QUEUE_SIZE
+            min_sleep = self.MIN_SLEEP
+            max_sleep = self.MAX_SLEEP
+            perf_counter = time.perf_counter
+            
+            # Lịch phát theo deadline trên đồng hồ monotonic - không cộng dồn sai lệch
+            next_deadline = perf_counter()
+            
             while True:
-                # Check if should stop
-                with QMutexLocker(self.mutex):
-                    if self.should_stop:
+                # Paused - chờ play()/stop() đánh thức thay vì polling
+                with QMutexLocker(mutex):
+                    resumed = False
+                    while not self.is_playing and not stop_event.is_set():
+                        state_changed.wait(mutex)
+                        resumed = True
+                    if stop_event.is_set():
                         break
-                    playing = self.is_playing
                 
-                if playing:
-                    # Calculate timing
-                    current_time = time.time()
-                    time_since_last_frame = current_time - self.last_frame_time
+                if resumed:
+                    # Bắt đầu lịch mới sau khi pause
+                    next_deadline = perf_counter()
+                
+                # Read frame
+                try:
+                    buffer = ring[ring_index] if ring_size else None
+                    result = read_frame_into(buffer)
+                    if stop_event.is_set():
+                        break
                     
-                    # Read frame
-                    try:
-                        result = self.video_processor.read_frame()
+                    if result:
+                        frame_id, timestamp, frame = result
+                        if ring_size:
+                            ring_index = (ring_index + 1) % ring_size
+                        
+                        # Đưa frame vào hàng đợi - không copy, xem RING_SIZE
+                        with QMutexLocker(mutex):
+                            if len(frames) == queue_size:
+                                self.dropped_frames += 1
+                            frames.append((frame, frame_id, timestamp))
                         
-                        if result:
-                            frame_id, timestamp, frame = result
-                            
-                            # Emit frame
-                            self.frame_ready.emit(frame.copy(), frame_id, timestamp)
-                            
-                            # Frame timing control
-                            self.last_frame_time = current_time
-                            
-                            # Sleep to maintain FPS
-                            sleep_time = frame_interval - time_since_last_frame
-                            if sleep_time > 0:
-                                self.msleep(int(sleep_time * 1000))
+                        # Bỏ qua các frame không phát (hết video thì lần đọc sau trả None)
+                        if skip > 1:
+                            grab_frames(skip - 1)
+                        
+                        # Frame timing control - thời gian decode đã nằm trong deadline
+                        next_deadline += frame_interval
+                        sleep_time = next_deadline - perf_counter()
+                        if sleep_time < 0:
+                            # Trễ (decode/GUI chậm) - đồng bộ lại, không phát dồn
+                            next_deadline = perf_counter()
+                        elif sleep_time > min_sleep:
+                            # Ngủ từng đoạn tối đa MAX_SLEEP cho tới deadline,
+                            # stop() đánh thức ngay qua cancel token
+                            while sleep_time > min_sleep:
+                                if stop_event.wait(min(sleep_time, max_sleep)):
+                                    break
+                                sleep_time = next_deadline - perf_counter()
                         else:
-                            # End of video
-                            self.playback_finished.emit()
-                            break
-                            
-                    except Exception as e:
-                        self.error_occurred.emit(f"Error reading frame: {str(e)}")
+                            self.yieldCurrentThread()
+                    else:
+                        # End of video
+                        self.playback_finished.emit()
                         break
-                else:
-                    # Paused - check periodically
-                    self.msleep(50)
+                        
+                except Exception as e:
+                    self.error_occurred.emit(f"Error reading frame: {str(e)}")
+                    break
                     
         except Exception as e:
             self.error_occurred.emit(f"Playback error: {str(e)}")
@@ -121,6 +245,7 @@ class VideoPlaybackThread(QThread):
                 self.is_playing = False
 
 
+@register('video')
 class VideoController(BaseController):
     """
     Improved video controller with better error handling
@@ -132,6 +257,27 @@ class VideoController(BaseController):
     playback_state_changed = pyqtSignal(str)
     frame_processed = pyqtSignal(int, float)
     
+    # (widget on view, widget signal, controller slot)
+    _VIEW_SIGNAL_MAP = (
+        ('btn_play', 'clicked', 'play_video'),
+        ('btn_pause', 'clicked', 'pause_video'),
+        ('btn_stop', 'clicked', 'stop_playback'),
+        ('slider_progress', 'sliderMoved', 'seek_to_frame'),
+        ('slider_progress', 'sliderReleased', 'flush_seek'),
+    )
+    
+    # Widget trên view được tra cứu một lần khi set_view (view có thể thiếu một số widget)
+    _VIEW_WIDGETS = (
+        'btn_play', 'btn_pause', 'btn_stop', 'slider_progress',
+        'lbl_current_time', 'lbl_video_name', 'lbl_video_info', 'lbl_total_time',
+    )
+    
+    # Gom các sự kiện kéo slider, chỉ seek tới vị trí cuối cùng (ms)
+    SEEK_DEBOUNCE_MS = 120
+    
+    # Chu kỳ cập nhật slider/nhãn thời gian khi đang phát (ms, ~20Hz)
+    UI_UPDATE_MS = 50
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         
@@ -139,27 +285,74 @@ class VideoController(BaseController):
         self.playback_thread = VideoPlaybackThread()
         self.is_processing = False
         
+        # Widget của view đã tra cứu sẵn (None nếu view không có)
+        self._view_widgets = {}
+        self._slider_progress = None
+        self._lbl_current_time = None
+        self._display_fn = None
+        
+        # GUI lấy frame mới nhất từ playback thread theo FPS của video
+        self._frame_timer = QTimer(self)
+        self._frame_timer.setTimerType(Qt.PreciseTimer)
+        self._frame_timer.timeout.connect(self._show_latest_frame)
+        
+        # Debounce seek khi kéo slider - mỗi seek phải decode lại từ keyframe
+        self._pending_seek = None
+        self._seek_timer = QTimer(self)
+        self._seek_timer.setSingleShot(True)
+        self._seek_timer.setInterval(self.SEEK_DEBOUNCE_MS)
+        self._seek_timer.timeout.connect(self._do_seek)
+        
+        # Slider/nhãn thời gian cập nhật theo UI_UPDATE_MS thay vì mỗi frame
+        self._latest_frame_id = None
+        self._latest_ts = 0.0
+        self._shown_frame_id = None
+        self._last_time_text = None
+        self._ui_timer = QTimer(self)
+        self._ui_timer.setInterval(self.UI_UPDATE_MS)
+        self._ui_timer.timeout.connect(self._flush_ui_updates)
+        
         # Connect thread signals
-        self.playback_thread.frame_ready.connect(self._on_frame_ready)
         self.playback_thread.playback_finished.connect(self._on_playback_finished)
         self.playback_thread.error_occurred.connect(self._on_playback_error)
         
     def _connect_view_signals(self):
         """Connect view signals - override from base"""
+        self._cache_view_widgets()
         if not self._view:
             return
             
-        # Connect playback controls
-        if hasattr(self._view, 'btn_play'):
-            self._view.btn_play.clicked.connect(self.play_video)
-        if hasattr(self._view, 'btn_pause'):
-            self._view.btn_pause.clicked.connect(self.pause_video)
-        if hasattr(self._view, 'btn_stop'):
-            self._view.btn_stop.clicked.connect(self.stop_playback)
-            
-        # Connect slider
-        if hasattr(self._view, 'slider_progress'):
-            self._view.slider_progress.sliderMoved.connect(self.seek_to_frame)
+        # Connect playback controls and slider
+        for widget_name, sig_name, slot_name in self._VIEW_SIGNAL_MAP:
+            widget = getattr(self._view, widget_name, None)
+            if widget is not None:
+                getattr(widget, sig_name).connect(getattr(self, slot_name))
+    
+    def _cache_view_widgets(self):
+        """Tra cứu widget của view một lần, tránh hasattr trên mỗi frame/sự kiện"""
+        view = self._view
+        self._view_widgets = {name: getattr(view, name, None) for name in self._VIEW_WIDGETS}
+        self._slider_progress = self._view_widgets['slider_progress']
+        self._lbl_current_time = self._view_widgets['lbl_current_time']
+        
+        if hasattr(view, 'display_frame'):
+            self._display_fn = view.display_frame
+        elif hasattr(view, 'video_display'):
+            self._display_fn = view.video_display.display_frame
+        else:
+            self._display_fn = None
+    
+    def _set_controls_enabled(self, **states):
+        """
+        Enable/disable playback controls có trên view
+        
+        Args:
+            **states: widget name -> enabled (e.g. btn_play=True)
+        """
+        for name, enabled in states.items():
+            widget = self._view_widgets.get(name)
+            if widget is not None:
+                widget.setEnabled(enabled)
     
     def _connect_model_callbacks(self):
         """Connect model callbacks - override from base"""
@@ -217,31 +410,24 @@ class VideoController(BaseController):
             # Update view with video info
             if self.view:
                 # Update labels
-                if hasattr(self.view, 'lbl_video_name'):
-                    self.view.lbl_video_name.setText(video_info.file_name)
-                if hasattr(self.view, 'lbl_video_info'):
-                    self.view.lbl_video_info.setText(f"{video_info.resolution} @ {video_info.fps}fps")
-                if hasattr(self.view, 'lbl_total_time'):
-                    self.view.lbl_total_time.setText(format_duration(video_info.duration))
+                widgets = self._view_widgets
+                if widgets.get('lbl_video_name') is not None:
+                    widgets['lbl_video_name'].setText(video_info.file_name)
+                if widgets.get('lbl_video_info') is not None:
+                    widgets['lbl_video_info'].setText(f"{video_info.resolution} @ {video_info.fps}fps")
+                if widgets.get('lbl_total_time') is not None:
+                    widgets['lbl_total_time'].setText(format_duration(video_info.duration))
                     
                 # Enable controls
-                if hasattr(self.view, 'btn_play'):
-                    self.view.btn_play.setEnabled(True)
-                if hasattr(self.view, 'btn_pause'):
-                    self.view.btn_pause.setEnabled(True)
-                if hasattr(self.view, 'btn_stop'):
-                    self.view.btn_stop.setEnabled(True)
-                if hasattr(self.view, 'slider_progress'):
-                    self.view.slider_progress.setEnabled(True)
-                    self.view.slider_progress.setMaximum(video_info.frame_count - 1)
+                self._set_controls_enabled(btn_play=True, btn_pause=True, btn_stop=True,
+                                           slider_progress=True)
+                if self._slider_progress is not None:
+                    self._slider_progress.setMaximum(video_info.frame_count - 1)
                     
-                # Display first frame
-                result = self._model.video_processor.read_frame()
-                if result:
-                    frame_id, timestamp, frame = result
+                # Display first frame - peek không làm dịch vị trí đọc
+                frame = self._model.video_processor.peek_first_frame()
+                if frame is not None:
                     self._display_frame(frame)
-                    # Reset to beginning after displaying first frame
-                    self._model.video_processor.seek_frame(0)
             
             # Emit signal
             self.video_loaded.emit(video_info)
@@ -252,15 +438,9 @@ class VideoController(BaseController):
         except Exception as e:
             error_msg = f"Failed to load video: {str(e)}"
             self.logger.error(error_msg)
+            # Main window hiển thị lỗi không modal (MainWindow.show_error) -
+            # không chặn event loop khi playback đang đẩy frame
             self.error_occurred.emit(error_msg)
-            
-            # Show error dialog
-            if self.view:
-                QMessageBox.critical(
-                    self.view,
-                    "Error Loading Video",
-                    error_msg
-                )
     
     def play_video(self):
         """Start or resume video playback"""
@@ -269,22 +449,21 @@ class VideoController(BaseController):
                 self.logger.warning("No video loaded")
                 return
             
-            # Start playback thread if not running
-            if not self.playback_thread.isRunning():
-                self.playback_thread.start()
-            
-            # Resume playback
+            # Resume playback - xóa cancel token của lần stop() trước rồi mới
+            # start thread, tránh run() thấy token cũ và thoát ngay
             self.playback_thread.play()
+            
+            # Start playback thread if not running - ưu tiên cao để decode
+            # không bị GUI/analysis chiếm lượt
+            if not self.playback_thread.isRunning():
+                self.playback_thread.start(QThread.HighPriority)
+            fps = self.playback_thread.playback_fps(self.current_video_info.fps)
+            self._frame_timer.start(max(1, int(1000 / fps)))
+            self._ui_timer.start()
             self.playback_state_changed.emit("playing")
 
             # Update button states
-            if self.view:
-                if hasattr(self.view, 'btn_play'):
-                    self.view.btn_play.setEnabled(False)
-                if hasattr(self.view, 'btn_pause'):
-                    self.view.btn_pause.setEnabled(True)
-                if hasattr(self.view, 'btn_stop'):
-                    self.view.btn_stop.setEnabled(True)
+            self._set_controls_enabled(btn_play=False, btn_pause=True, btn_stop=True)
             
         except Exception as e:
             error_msg = f"Failed to play video: {str(e)}"
@@ -295,14 +474,14 @@ class VideoController(BaseController):
         """Pause video playback"""
         try:
             self.playback_thread.pause()
+            self._frame_timer.stop()
+            self._ui_timer.stop()
+            self._show_latest_frame()
+            self._flush_ui_updates()
             self.playback_state_changed.emit("paused")
 
             # Update button states
-            if self.view:
-                if hasattr(self.view, 'btn_play'):
-                    self.view.btn_play.setEnabled(True)
-                if hasattr(self.view, 'btn_pause'):
-                    self.view.btn_pause.setEnabled(False)
+            self._set_controls_enabled(btn_play=True, btn_pause=False)
 
         except Exception as e:
             self.logger.error(f"Error pausing video: {e}")
@@ -313,36 +492,51 @@ class VideoController(BaseController):
             self.logger.info("Stopping video playback")
             
             # Stop playback thread
+            self._frame_timer.stop()
+            self._ui_timer.stop()
+            self._seek_timer.stop()
+            self._pending_seek = None
             self.playback_thread.stop()
             
-            # Reset to beginning
+            # Reset to beginning and display first frame
             if self._model and self._model.video_processor:
-                self._model.video_processor.seek_frame(0)
-                
-                # Display first frame
-                result = self._model.video_processor.read_frame()
-                if result:
-                    frame_id, timestamp, frame = result
+                frame = self._model.video_processor.peek_first_frame()
+                if frame is not None:
                     self._display_frame(frame)
-                    self._model.video_processor.seek_frame(0)
             
             # Update state
             self.playback_state_changed.emit("stopped")
 
             # Update button states
-            if self.view:
-                if hasattr(self.view, 'btn_play'):
-                    self.view.btn_play.setEnabled(True)
-                if hasattr(self.view, 'btn_pause'):
-                    self.view.btn_pause.setEnabled(False)
-                if hasattr(self.view, 'btn_stop'):
-                    self.view.btn_stop.setEnabled(True)
+            self._set_controls_enabled(btn_play=True, btn_pause=False, btn_stop=True)
             
         except Exception as e:
             self.logger.error(f"Error stopping playback: {e}")
     
     def seek_to_frame(self, frame_number: int):
-        """Seek to specific frame"""
+        """
+        Request seek to specific frame (debounced)
+        
+        Args:
+            frame_number: Target frame, chỉ yêu cầu cuối cùng trong
+                SEEK_DEBOUNCE_MS được thực hiện
+        """
+        self._pending_seek = frame_number
+        self._seek_timer.start()
+    
+    def flush_seek(self):
+        """Thực hiện ngay seek đang chờ (e.g. khi thả slider)"""
+        if self._pending_seek is not None:
+            self._seek_timer.stop()
+            self._do_seek()
+    
+    def _do_seek(self):
+        """Seek to the last requested frame"""
+        frame_number = self._pending_seek
+        self._pending_seek = None
+        if frame_number is None:
+            return
+        
         try:
             if not self.current_video_info:
                 return
@@ -439,24 +633,13 @@ class VideoController(BaseController):
     def _on_frame_ready(self, frame: np.ndarray, frame_id: int, timestamp: float):
         """Handle frame ready from playback thread"""
         try:
-            # Display frame
             self._display_frame(frame)
             
-            # Get analysis results if processing
-            if self.is_processing and hasattr(self._model, 'get_frame_results'):
-                results = self._model.get_frame_results(frame_id)
-                if results:
-                    # Draw overlays
-                    overlays = self._prepare_overlays(results)
-                    frame_with_overlays = self._model.video_processor.draw_on_frame(frame, overlays)
-                    self._display_frame(frame_with_overlays)
-            
-            # Update timeline
-            if self.view:
-                if hasattr(self.view, 'slider_progress'):
-                    self.view.slider_progress.setValue(frame_id)
-                if hasattr(self.view, 'lbl_current_time'):
-                    self.view.lbl_current_time.setText(format_duration(timestamp))
+            # Update timeline - khi đang phát _ui_timer sẽ ghi giá trị mới nhất
+            self._latest_frame_id = frame_id
+            self._latest_ts = timestamp
+            if not self._ui_timer.isActive():
+                self._flush_ui_updates()
             
             # Emit progress
             self.frame_processed.emit(frame_id, timestamp)
@@ -464,17 +647,55 @@ class VideoController(BaseController):
         except Exception as e:
             self.logger.error(f"Error processing frame {frame_id}: {e}")
     
+    @pyqtSlot()
+    def _flush_ui_updates(self):
+        """Ghi frame_id/thời gian mới nhất lên slider và nhãn (bỏ qua nếu không đổi)"""
+        frame_id = self._latest_frame_id
+        if frame_id is None:
+            return
+        
+        if frame_id != self._shown_frame_id:
+            self._shown_frame_id = frame_id
+            if self._slider_progress is not None:
+                # Giá trị đặt từ code - không kích hoạt các slot của valueChanged
+                blocker = QSignalBlocker(self._slider_progress)
+                self._slider_progress.setValue(frame_id)
+                blocker.unblock()
+        
+        # Nhãn bị ẩn (tab khác) thì không format/setText; hiện lại sẽ được
+        # cập nhật ở lần flush kế tiếp
+        label = self._lbl_current_time
+        if label is not None and label.isVisible():
+            text = format_duration(self._latest_ts)
+            if text != self._last_time_text:
+                label.setText(text)
+                self._last_time_text = text
+    
+    @pyqtSlot()
+    def _show_latest_frame(self):
+        """Hiển thị frame mới nhất từ playback thread (nếu có)"""
+        entry = self.playback_thread.take_latest()
+        if entry is not None:
+            self._on_frame_ready(*entry)
+    
     def _display_frame(self, frame: np.ndarray):
         """Display frame in video widget"""
-        if self.view and hasattr(self.view, 'display_frame'):
-            self.view.display_frame(frame)
-        elif self.view and hasattr(self.view, 'video_display'):
-            self.view.video_display.display_frame(frame)
+        if self._display_fn is not None:
+            self._display_fn(frame)
     
     @pyqtSlot()
     def _on_playback_finished(self):
         """Handle playback finished"""
         self.logger.info("Video playback finished")
+        
+        # Hiển thị frame cuối còn trong hàng đợi
+        self._frame_timer.stop()
+        self._ui_timer.stop()
+        self._show_latest_frame()
+        self._flush_ui_updates()
+        if self.playback_thread.dropped_frames:
+            self.logger.debug(f"Dropped {self.playback_thread.dropped_frames} late frames")
+        
         self.playback_state_changed.emit("finished")
         
         # Auto-stop if processing
@@ -490,54 +711,14 @@ class VideoController(BaseController):
         # Stop playback on error
         self.stop_playback()
     
-    def _prepare_overlays(self, results: dict) -> dict:
-        """Prepare overlay data from analysis results"""
-        overlays = {
-            'boxes': [],
-            'lines': [],
-            'texts': []
-        }
-        
-        try:
-            # Add detection boxes
-            if 'detections' in results:
-                for det in results['detections']:
-                    color = (0, 255, 0)  # Green for vehicles
-                    if det.get('type') == 'person':
-                        color = (255, 0, 0)  # Red for persons
-                    elif det.get('type') == 'obstacle':
-                        color = (0, 0, 255)  # Blue for obstacles
-                    
-                    overlays['boxes'].append({
-                        'bbox': det['bbox'],
-                        'label': f"{det['type']} {det.get('id', '')}",
-                        'color': color
-                    })
-            
-            # Add traffic statistics
-            if 'statistics' in results:
-                stats = results['statistics']
-                y_pos = 30
-                for key, value in stats.items():
-                    overlays['texts'].append({
-                        'content': f"{key}: {value}",
-                        'position': (10, y_pos),
-                        'color': (255, 255, 255),
-                        'scale': 0.6
-                    })
-                    y_pos += 25
-            
-        except Exception as e:
-            self.logger.error(f"Error preparing overlays: {e}")
-        
-        return overlays
-    
     def cleanup(self):
         """Cleanup resources"""
         try:
             self.logger.info("Cleaning up VideoController")
             
             # Stop and clean up playback thread
+            self._frame_timer.stop()
+            self._ui_timer.stop()
             if self.playback_thread.isRunning():
                 self.playback_thread.stop()
             
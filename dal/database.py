@@ -1,15 +1,20 @@
 # dal/database.py
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.pool import QueuePool
 import logging
+import json
+from functools import partial
 from typing import Optional
 from contextlib import contextmanager
 
 # Base class for all models
 Base = declarative_base()
 
+# JSON columns ghi dạng compact (không khoảng trắng sau ',' và ':')
+_json_serializer = partial(json.dumps, separators=(',', ':'))
+
 class DatabaseManager:
     """
     Quản lý database connection và sessions
@@ -20,6 +25,9 @@ class DatabaseManager:
     _engine = None
     _session_factory = None
     
+    # Index đã được thay thế trong models - create_all không tự xoá khỏi DB cũ
+    _OBSOLETE_INDEXES = ('idx_video_crossed',)
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseManager, cls).__new__(cls)
@@ -51,6 +59,7 @@ class DatabaseManager:
                 poolclass=QueuePool,
                 pool_size=5,
                 max_overflow=10,
+                json_serializer=_json_serializer,
                 connect_args={
                     "check_same_thread": False,
                     "timeout": 15
@@ -61,10 +70,15 @@ class DatabaseManager:
             @event.listens_for(self._engine, "connect")
             def set_sqlite_pragma(dbapi_connection, connection_record):
                 cursor = dbapi_connection.cursor()
+                # page_size chỉ có hiệu lực với file DB mới (trước khi bật WAL/tạo bảng)
+                cursor.execute("PRAGMA page_size=8192")
                 cursor.execute("PRAGMA journal_mode=WAL")
                 cursor.execute("PRAGMA synchronous=NORMAL")
                 cursor.execute("PRAGMA cache_size=10000")
                 cursor.execute("PRAGMA foreign_keys=ON")
+                # Đọc qua memory map (256 MB) và giữ bảng tạm của GROUP BY/ORDER BY trong RAM
+                cursor.execute("PRAGMA mmap_size=268435456")
+                cursor.execute("PRAGMA temp_store=MEMORY")
                 cursor.close()
         else:
             # PostgreSQL or other databases
@@ -74,7 +88,8 @@ class DatabaseManager:
                 poolclass=QueuePool,
                 pool_size=20,
                 max_overflow=40,
-                pool_pre_ping=True
+                pool_pre_ping=True,
+                json_serializer=_json_serializer
             )
         
         # Create session factory
@@ -94,8 +109,24 @@ class DatabaseManager:
             raise RuntimeError("Database not initialized")
             
         Base.metadata.create_all(self._engine)
+        self._upgrade_indexes()
         self.logger.info("All tables created")
     
+    def _upgrade_indexes(self):
+        """
+        Đồng bộ index của các bảng đã có với models
+        
+        create_all chỉ tạo index cùng với bảng mới, nên DB tạo từ phiên bản
+        trước sẽ thiếu index mới và còn giữ index cũ. Chạy lại nhiều lần
+        không sao (checkfirst / IF EXISTS).
+        """
+        with self._engine.begin() as conn:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.create(conn, checkfirst=True)
+            for name in self._OBSOLETE_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+    
     def drop_all_tables(self):
         """Drop all tables (use with caution!)"""
         if self._engine is None:
@@ -123,19 +154,28 @@ class DatabaseManager:
         """
         Provide transactional scope for database operations
         
+        Uses its own short-lived session (sessionmaker.begin() commits or
+        rolls back and closes it on exit) instead of the thread-local one,
+        so entities held by repositories on this thread stay attached.
+        
         Usage:
             with db_manager.session_scope() as session:
                 session.add(object)
         """
-        session = self.session
-        try:
+        if self._session_factory is None:
+            raise RuntimeError("Database not initialized")
+        with self._session_factory.session_factory.begin() as session:
             yield session
-            session.commit()
-        except Exception:
-            session.rollback()
-            raise
-        finally:
-            session.close()
+    
+    def remove_session(self):
+        """
+        Close and discard the calling thread's scoped session
+        
+        Worker threads call this when a job ends so the next job starts with
+        an empty identity map; objects it returned become detached.
+        """
+        if self._session_factory is not None:
+            self._session_factory.remove()
     
     def close(self):
         """Close database connections"""
@@ -56,7 +56,8 @@ class DetectionEvent(Base):
         Index('idx_video_frame', 'video_id', 'frame_number'),
         Index('idx_video_time', 'video_id', 'timestamp_in_video'),
         Index('idx_video_object', 'video_id', 'object_type'),
-        Index('idx_video_crossed', 'video_id', 'crossed_line'),
+        # Covering index: đếm crossing theo object_type chỉ cần đọc index, không đọc bảng
+        Index('idx_video_crossed_type_ts', 'video_id', 'crossed_line', 'object_type', 'timestamp_in_video'),
         Index('idx_time_interval', 'video_id', 'timestamp_in_video', 'object_type'),  # For time-based queries
     )
     
@@ -1,6 +1,6 @@
 # dal/models/traffic_data.py
 from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property, deferred
 from sqlalchemy.sql import func
 
 from ..database import Base
@@ -26,6 +26,13 @@ class TrafficData(Base):
     truck_count = Column(Integer, default=0)
     bus_count = Column(Integer, default=0)
     
+    # Percentage breakdown - tính trong SQL ngay trong câu SELECT (kể cả khi
+    # joinedload từ Video), NULL khi total_vehicles = 0
+    car_pct = column_property(car_count * 100.0 / func.nullif(total_vehicles, 0))
+    motorbike_pct = column_property(motorbike_count * 100.0 / func.nullif(total_vehicles, 0))
+    truck_pct = column_property(truck_count * 100.0 / func.nullif(total_vehicles, 0))
+    bus_pct = column_property(bus_count * 100.0 / func.nullif(total_vehicles, 0))
+    
     # Traffic density metrics
     avg_vehicles_per_minute = Column(Float)
     peak_vehicles_per_minute = Column(Integer)
@@ -33,11 +40,13 @@ class TrafficData(Base):
     
     # Time-based aggregations (stored as JSON)
     # Format: {"0": {"car": 5, "motorbike": 3}, "1": {...}, ...}
-    minute_aggregations = Column(JSON)  # Counts per minute
-    hour_aggregations = Column(JSON)    # Counts per hour
+    # Deferred: chỉ đọc và parse JSON khi truy cập (một SELECT cho cả nhóm),
+    # các query thống kê/danh sách không phải tải các blob này
+    minute_aggregations = deferred(Column(JSON), group='aggregations')  # Counts per minute
+    hour_aggregations = deferred(Column(JSON), group='aggregations')    # Counts per hour
     
     # Lane-specific data (if applicable)
-    lane_data = Column(JSON)  # {"lane_1": {"car": 10, ...}, ...}
+    lane_data = deferred(Column(JSON), group='aggregations')  # {"lane_1": {"car": 10, ...}, ...}
     
     # Traffic flow metrics
     avg_speed = Column(Float)  # If speed detection is implemented
@@ -63,6 +72,15 @@ class TrafficData(Base):
             "total": self.total_vehicles
         }
     
+    def get_vehicle_percentages(self):
+        """Get SQL-computed percentages as dictionary (0.0 when no vehicles)"""
+        return {
+            "car": self.car_pct or 0.0,
+            "motorbike": self.motorbike_pct or 0.0,
+            "truck": self.truck_pct or 0.0,
+            "bus": self.bus_pct or 0.0
+        }
+    
     def get_minute_counts(self, minute: int):
         """Get counts for specific minute"""
         if self.minute_aggregations:
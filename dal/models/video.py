@@ -35,10 +35,10 @@ class Video(Base):
     # Storage path for processed results (if needed)
     storage_path = Column(String(500))
     
-    # Relationships
-    detection_events = relationship("DetectionEvent", back_populates="video", cascade="all, delete-orphan")
-    traffic_data = relationship("TrafficData", back_populates="video", uselist=False, cascade="all, delete-orphan")
-    anomaly_events = relationship("AnomalyEvent", back_populates="video", cascade="all, delete-orphan")
+    # Relationships - passive_deletes: để ON DELETE CASCADE của DB xoá bản ghi con
+    detection_events = relationship("DetectionEvent", back_populates="video", cascade="all, delete-orphan", passive_deletes=True)
+    traffic_data = relationship("TrafficData", back_populates="video", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    anomaly_events = relationship("AnomalyEvent", back_populates="video", cascade="all, delete-orphan", passive_deletes=True)
     
     def __repr__(self):
         return f"<Video(id={self.id}, file_name='{self.file_name}', status='{self.status}')>"
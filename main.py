@@ -28,7 +28,7 @@ from utils.app_monitor import get_app_monitor
 from views import MainWindow
 from controllers import MainController
 from models.video_analysis_orchestrator import VideoAnalysisOrchestrator
-from utils import setup_logger, config_manager
+from utils import setup_logger, config_manager, apply_ffmpeg_capture_options, apply_opencv_threads
 from dal import db_manager
 
 # Setup logging
@@ -272,6 +272,8 @@ class TrafficMonitoringApp:
             self.splash.set_progress(10)
             self.splash.showMessage("Đang tải cấu hình...", Qt.AlignCenter | Qt.AlignBottom, Qt.white)
             config = config_manager.load_config()
+            apply_ffmpeg_capture_options(config_manager.get('video_processing.ffmpeg_capture_options', ''))
+            apply_opencv_threads(config_manager.get('video_processing.opencv_threads', 2))
             
             # Step 4: Setup logging
             self.splash.set_progress(20)
@@ -35,6 +35,12 @@ class ObjectDetector:
             # Add more mappings as needed
         }
         
+        # Lọc class (None = giữ tất cả). Mask bool theo class id của model
+        # được dựng một lần, lọc cả frame bằng một phép index NumPy
+        self.enabled_classes: Optional[set] = None
+        self._class_mask: Optional[np.ndarray] = None
+        self._class_mask_names: Optional[Dict[int, str]] = None
+        
         # Load model
         if model_path:
             self.load_model(model_path)
@@ -109,20 +115,20 @@ class ObjectDetector:
         
         # Get boxes, classes, and confidences
         if result.boxes is not None:
-            boxes = result.boxes.xyxy.cpu().numpy()  # Bounding boxes
-            classes = result.boxes.cls.cpu().numpy()  # Class indices
+            boxes = result.boxes.xyxy.cpu().numpy().astype(int)  # Bounding boxes
+            classes = result.boxes.cls.cpu().numpy().astype(np.intp)  # Class indices
             confidences = result.boxes.conf.cpu().numpy()  # Confidence scores
             
             # Get class names
             names = result.names  # Dictionary mapping class index to name
             
-            for i in range(len(boxes)):
-                # Extract info
-                x1, y1, x2, y2 = boxes[i]
-                x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                
-                confidence = float(confidences[i])
-                class_idx = int(classes[i])
+            # Chỉ giữ các class được bật (vectorized), không lọc nếu chưa cấu hình
+            if self.enabled_classes is not None:
+                keep = np.flatnonzero(self._get_class_mask(names)[classes])
+                boxes, classes, confidences = boxes[keep], classes[keep], confidences[keep]
+            
+            for (x1, y1, x2, y2), class_idx, confidence in zip(
+                    boxes.tolist(), classes.tolist(), confidences.tolist()):
                 class_name = names[class_idx]
                 
                 # Map to our classes
@@ -140,6 +146,28 @@ class ObjectDetector:
         
         return detections
     
+    def set_enabled_classes(self, class_names: Optional[List[str]]):
+        """
+        Chỉ giữ detections thuộc các class này (tên sau khi map)
+        
+        Args:
+            class_names: Danh sách class, None để giữ tất cả
+        """
+        self.enabled_classes = set(class_names) if class_names is not None else None
+        self._class_mask = None
+        self._class_mask_names = None
+        self.logger.info(f"Enabled classes: {'all' if self.enabled_classes is None else sorted(self.enabled_classes)}")
+    
+    def _get_class_mask(self, names: Dict[int, str]) -> np.ndarray:
+        """Bool mask theo class id của model, dựng lại khi bảng tên class đổi"""
+        if self._class_mask is None or self._class_mask_names is not names:
+            mask = np.zeros(max(names) + 1, dtype=bool)
+            for class_idx, class_name in names.items():
+                mask[class_idx] = self.class_mapping.get(class_name, class_name) in self.enabled_classes
+            self._class_mask = mask
+            self._class_mask_names = names
+        return self._class_mask
+    
     def get_supported_classes(self) -> List[str]:
         """Get list of supported object classes"""
         return list(self.class_mapping.values())
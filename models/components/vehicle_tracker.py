@@ -1,12 +1,22 @@
 # models/components/vehicle_tracker.py
 import numpy as np
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, List, Tuple, Set, Optional, Sequence
 from collections import deque
 import logging
 
 from ..entities import Detection
 
 
+# Hướng đếm -> (trục, dấu) mà curr - prev phải dương
+_DIRECTION_AXES = {"down": (1, 1), "up": (1, -1), "right": (0, 1), "left": (0, -1)}
+
+
+def _ccw(a: np.ndarray, b: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Vectorized ccw test: True nếu a, b, c ngược chiều kim đồng hồ (broadcast theo hàng)"""
+    return ((c[..., 1] - a[..., 1]) * (b[..., 0] - a[..., 0]) >
+            (b[..., 1] - a[..., 1]) * (c[..., 0] - a[..., 0]))
+
+
 class VehicleTracker:
     """
     Component chịu trách nhiệm tracking vehicles (VT)
@@ -124,50 +134,65 @@ class VehicleTracker:
         Returns:
             True nếu vượt qua line theo đúng hướng
         """
-        if obj_id not in self.tracking_history:
-            return False
+        return bool(self.check_line_crossings([obj_id], line_start, line_end, direction)[0])
+    
+    def check_line_crossings(self, obj_ids: Sequence[str],
+                             line_start: Tuple[int, int],
+                             line_end: Tuple[int, int],
+                             direction: str = "down") -> np.ndarray:
+        """
+        Kiểm tra line crossing cho nhiều objects trong một lượt NumPy
         
-        history = self.tracking_history[obj_id]
-        if len(history) < 2:
-            return False
+        Đoạn di chuyển (prev, curr) của các track được xếp thành mảng (M, 4)
+        rồi kiểm tra giao cắt và hướng cho cả frame cùng lúc.
+        
+        Args:
+            obj_ids: Object IDs trong frame hiện tại
+            line_start: Điểm đầu của line
+            line_end: Điểm cuối của line
+            direction: Hướng đếm (up/down/left/right)
+            
+        Returns:
+            Bool array cùng thứ tự obj_ids, True nếu vượt line lần đầu
+        """
+        crossed = np.zeros(len(obj_ids), dtype=bool)
+        
+        # Chỉ xét các track có đủ 2 vị trí và chưa được đếm
+        rows = []
+        segments = []
+        for i, obj_id in enumerate(obj_ids):
+            history = self.tracking_history.get(obj_id)
+            if obj_id in self.counted_ids or history is None or len(history) < 2:
+                continue
+            rows.append(i)
+            segments.append(history[-2][:2] + history[-1][:2])
         
-        # Lấy 2 vị trí gần nhất
-        prev_pos = history[-2][:2]
-        curr_pos = history[-1][:2]
+        if not rows:
+            return crossed
+        
+        segments = np.array(segments, dtype=np.float64)
+        prev, curr = segments[:, :2], segments[:, 2:]
+        p3 = np.asarray(line_start, dtype=np.float64)
+        p4 = np.asarray(line_end, dtype=np.float64)
         
         # Kiểm tra intersection
-        if not self._line_intersection(prev_pos, curr_pos, line_start, line_end):
-            return False
+        hits = ((_ccw(prev, p3, p4) != _ccw(curr, p3, p4)) &
+                (_ccw(prev, curr, p3) != _ccw(prev, curr, p4)))
         
         # Kiểm tra hướng
-        if direction == "down" and curr_pos[1] <= prev_pos[1]:
-            return False
-        elif direction == "up" and curr_pos[1] >= prev_pos[1]:
-            return False
-        elif direction == "left" and curr_pos[0] >= prev_pos[0]:
-            return False
-        elif direction == "right" and curr_pos[0] <= prev_pos[0]:
-            return False
-        
-        # Kiểm tra đã đếm chưa
-        if obj_id in self.counted_ids:
-            return False
-        
-        # Mark as counted
-        self.counted_ids.add(obj_id)
-        return True
-    
-    def _line_intersection(self, p1: Tuple[float, float], p2: Tuple[float, float],
-                          p3: Tuple[int, int], p4: Tuple[int, int]) -> bool:
-        """
-        Kiểm tra 2 đoạn thẳng có cắt nhau không
-        p1-p2: movement line
-        p3-p4: counting line
-        """
-        def ccw(A, B, C):
-            return (C[1]-A[1]) * (B[0]-A[0]) > (B[1]-A[1]) * (C[0]-A[0])
-        
-        return ccw(p1, p3, p4) != ccw(p2, p3, p4) and ccw(p1, p2, p3) != ccw(p1, p2, p4)
+        axis_sign = _DIRECTION_AXES.get(direction)
+        if axis_sign is not None:
+            axis, sign = axis_sign
+            hits &= sign * (curr[:, axis] - prev[:, axis]) > 0
+        
+        # Mark as counted - ID lặp lại trong cùng frame chỉ đếm một lần
+        for i in np.flatnonzero(hits):
+            obj_id = obj_ids[rows[i]]
+            if obj_id not in self.counted_ids:
+                self.counted_ids.add(obj_id)
+                crossed[rows[i]] = True
+        
+        return crossed
     
     def get_movement_info(self, obj_id: str, time_window: float = 1.0) -> Dict[str, float]:
         """
@@ -30,15 +30,27 @@ class VideoProcessor:
         self._reader_thread: Optional[threading.Thread] = None
         self._stop_reader = threading.Event()
         
-    def open_video(self, file_path: str) -> VideoInfo:
+        # Frame 0 đã decode sẵn (preview); _first_pending = lần đọc kế tiếp trả về nó
+        self._first_frame: Optional[np.ndarray] = None
+        self._first_pending = False
+        
+    def open_video(self, file_path: str, hwaccel: Optional[bool] = None) -> VideoInfo:
         """
         Open video with proper error handling and thread safety
+        
+        Args:
+            file_path: Path to video file
+            hwaccel: Decode bằng phần cứng (NVDEC/VAAPI/D3D11...) nếu có,
+                None = theo config video_processing.hw_acceleration
         """
 
         from utils import config_manager  # import trực tiếp để dùng config
 
         # Đọc thread_count từ config (mặc định = 1)
         thread_count = config_manager.get("video_processing.max_processing_threads", 1)
+        if hwaccel is None:
+            hwaccel = config_manager.get("video_processing.hw_acceleration", False)
+        hw_device = config_manager.get("video_processing.hw_device", -1)
         self.logger.info(f"Opening video: {file_path}")
         
         # Validate file exists
@@ -53,7 +65,7 @@ class VideoProcessor:
         # Thread-safe video opening
         with self._lock:
             # Use specific codec to avoid FFmpeg issues
-            self.cap = cv2.VideoCapture(str(file_path), cv2.CAP_FFMPEG)
+            self.cap = self._open_capture(str(file_path), hwaccel, hw_device)
 
             # Giới hạn số thread decode
             if thread_count <= 0:
@@ -102,11 +114,43 @@ class VideoProcessor:
             
             self.state = ProcessingState.IDLE
             self.current_frame_id = 0
+            self._first_frame = None
+            self._first_pending = False
             
         self.logger.info(f"Video opened: {width}x{height} @ {fps}fps, {frame_count} frames")
         
         return self.video_info
     
+    def _open_capture(self, file_path: str, hwaccel: bool, hw_device: int) -> cv2.VideoCapture:
+        """
+        Open FFmpeg capture, thử decode phần cứng trước nếu được bật
+        
+        Args:
+            file_path: Path to video file
+            hwaccel: Thử VIDEO_ACCELERATION_ANY
+            hw_device: GPU index, -1 = mặc định
+            
+        Returns:
+            cv2.VideoCapture (software decode nếu không có phần cứng phù hợp)
+        """
+        if hwaccel and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+            params = [
+                cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+                cv2.CAP_PROP_HW_DEVICE, hw_device,
+            ]
+            cap = cv2.VideoCapture(file_path, cv2.CAP_FFMPEG, params)
+            if cap.isOpened():
+                accel = int(cap.get(cv2.CAP_PROP_HW_ACCELERATION))
+                if accel != cv2.VIDEO_ACCELERATION_NONE:
+                    self.logger.info(f"Hardware decoding enabled (acceleration type {accel})")
+                else:
+                    self.logger.info("No hardware decoder for this video, using software decoding")
+                return cap
+            cap.release()
+            self.logger.warning("Hardware-accelerated open failed, falling back to software decoding")
+        
+        return cv2.VideoCapture(file_path, cv2.CAP_FFMPEG)
+    
     def start_reader_thread(self):
         """Start background thread for reading frames"""
         if self._reader_thread is None or not self._reader_thread.is_alive():
@@ -154,10 +198,33 @@ class VideoProcessor:
         """
         Read frame from queue (thread-safe)
         """
+        return self.read_frame_into(None)
+    
+    def read_frame_into(self, out: Optional[np.ndarray]) -> Optional[Tuple[int, float, np.ndarray]]:
+        """
+        Read frame, decoding directly into a caller-owned buffer when possible
+        
+        Args:
+            out: Preallocated (H, W, 3) uint8 buffer, None để cấp phát mới.
+                 Frame lấy từ hàng đợi của reader thread không dùng buffer này.
+        
+        Returns:
+            (frame_id, timestamp, frame) or None
+        """
         # Check if video is open
         if self.cap is None or not self.cap.isOpened():
             return None
             
+        # Frame 0 đã decode bởi peek_first_frame()
+        if self._first_pending:
+            with self._lock:
+                if self._first_pending:
+                    self._first_pending = False
+                    if out is not None and out.shape == self._first_frame.shape:
+                        np.copyto(out, self._first_frame)
+                        return 0, 0.0, out
+                    return 0, 0.0, self._first_frame.copy()
+            
         # If state is PLAYING, use reader thread
         if self.state == ProcessingState.PLAYING and (self._reader_thread is None or not self._reader_thread.is_alive()):
             self.start_reader_thread()
@@ -172,7 +239,7 @@ class VideoProcessor:
                     if self.cap is None or not self.cap.isOpened():
                         return None
                     
-                    ret, frame = self.cap.read()
+                    ret, frame = self.cap.read(out) if out is not None else self.cap.read()
                     
                     if not ret:
                         self.state = ProcessingState.COMPLETED
@@ -190,6 +257,38 @@ class VideoProcessor:
             self.logger.error(f"Error reading frame: {e}")
             return None
     
+    def grab_frames(self, count: int) -> int:
+        """
+        Advance past frames without retrieving them
+        
+        cap.grab() chỉ demux/decode, bỏ qua bước retrieve (chuyển màu + copy
+        ra ndarray) - dùng khi phát ở FPS thấp hơn FPS nguồn. Chỉ dùng cho
+        đường đọc trực tiếp (không qua reader thread).
+        
+        Args:
+            count: Số frame bỏ qua
+            
+        Returns:
+            Số frame đã bỏ qua (< count khi hết video)
+        """
+        with self._lock:
+            if self.cap is None or not self.cap.isOpened():
+                return 0
+            
+            skipped = 0
+            if self._first_pending and count > 0:
+                # Frame 0 đã decode sẵn - bỏ qua mà không cần grab
+                self._first_pending = False
+                skipped = 1
+            
+            while skipped < count:
+                if not self.cap.grab():
+                    self.state = ProcessingState.COMPLETED
+                    break
+                self.current_frame_id += 1
+                skipped += 1
+            return skipped
+    
     def read_frames(self, batch_size: int = 1) -> Generator[Tuple[int, float, np.ndarray], None, None]:
         """
         Generator for reading frames in batches
@@ -220,10 +319,50 @@ class VideoProcessor:
                 
                 self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
                 self.current_frame_id = frame_number
+                self._first_pending = False
                 return True
             
             return False
     
+    def peek_first_frame(self) -> Optional[np.ndarray]:
+        """
+        Get frame 0 for preview without consuming it
+        
+        Frame 0 được decode một lần và cache lại; read_frame() kế tiếp trả về
+        frame 0 từ cache, decoder đã đứng ở frame 1 nên không phải seek về 0
+        rồi decode lại.
+        
+        Returns:
+            Frame 0 (read-only, owned by the processor) or None
+        """
+        with self._lock:
+            if self.cap is None or not self.cap.isOpened():
+                return None
+            if self._first_pending:
+                return self._first_frame
+            
+            if self._first_frame is None:
+                if self.current_frame_id != 0:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ret, frame = self.cap.read()
+                if not ret:
+                    return None
+                self._first_frame = frame
+            else:
+                # Frame 0 đã có - chỉ cần đặt decoder ngay sau nó
+                self.cap.set(cv2.CAP_PROP_POS_FRAMES, 1)
+            
+            # Bỏ các frame đọc trước của reader thread
+            while not self._frame_queue.empty():
+                try:
+                    self._frame_queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            self.current_frame_id = 1
+            self._first_pending = True
+            return self._first_frame
+    
     def get_current_position(self) -> Tuple[int, float]:
         """
         Get current position (thread-safe)
@@ -350,6 +489,8 @@ class VideoProcessor:
             self.video_info = None
             self.state = ProcessingState.IDLE
             self.current_frame_id = 0
+            self._first_frame = None
+            self._first_pending = False
         
         self.logger.info("Video closed successfully")
     
@@ -3,6 +3,7 @@ from .video_info import VideoInfo
 from .detection_result import DetectionResult, Detection
 from .traffic_data import TrafficData, VehicleCount
 from .processing_state import ProcessingState
+from .video_detail_bundle import VideoDetailBundle, VideoSummary, TrafficSummary, AnomalySummary
 
 __all__ = [
     'VideoInfo', 
@@ -10,5 +11,9 @@ __all__ = [
     'Detection',
     'TrafficData', 
     'VehicleCount',
-    'ProcessingState'
+    'ProcessingState',
+    'VideoDetailBundle',
+    'VideoSummary',
+    'TrafficSummary',
+    'AnomalySummary'
 ]
\ No newline at end of file
@@ -0,0 +1,70 @@
+# models/entities/video_detail_bundle.py
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class VideoSummary:
+    """Thông tin video hiển thị ở tab chi tiết (bản sao của dal.models.Video)"""
+    id: int
+    file_name: str
+    processing_timestamp: Optional[datetime]
+    duration: Optional[float]
+    resolution: Optional[str]
+    fps: Optional[float]
+    processing_duration: Optional[float]
+    
+    @classmethod
+    def from_model(cls, video) -> 'VideoSummary':
+        return cls(video.id, video.file_name, video.processing_timestamp, video.duration,
+                   video.resolution, video.fps, video.processing_duration)
+
+
+@dataclass(frozen=True)
+class TrafficSummary:
+    """Thống kê giao thông của video (bản sao của dal.models.TrafficData)"""
+    total_vehicles: int
+    car_count: int
+    motorbike_count: int
+    truck_count: int
+    bus_count: int
+    congestion_level: Optional[str]
+    percentages: Dict[str, float]  # car/motorbike/truck/bus -> %
+    
+    @classmethod
+    def from_model(cls, traffic_data) -> 'TrafficSummary':
+        return cls(traffic_data.total_vehicles or 0, traffic_data.car_count or 0,
+                   traffic_data.motorbike_count or 0, traffic_data.truck_count or 0,
+                   traffic_data.bus_count or 0, traffic_data.congestion_level,
+                   traffic_data.get_vehicle_percentages())
+
+
+@dataclass(frozen=True)
+class AnomalySummary:
+    """Một sự kiện bất thường (bản sao của dal.models.AnomalyEvent)"""
+    timestamp_in_video: float
+    anomaly_type: str
+    severity_level: str
+    alert_message: Optional[str]
+    
+    @classmethod
+    def from_model(cls, anomaly) -> 'AnomalySummary':
+        return cls(anomaly.timestamp_in_video, anomaly.anomaly_type,
+                   anomaly.severity_level, anomaly.alert_message)
+
+
+@dataclass(frozen=True)
+class VideoDetailBundle:
+    """
+    Entity gom dữ liệu chi tiết của một video cho màn hình lịch sử
+    
+    Chỉ chứa dữ liệu thuần (không phải ORM object) nên có thể cache và dùng
+    trên GUI thread sau khi session của worker đã đóng.
+    """
+    video: VideoSummary
+    traffic_data: Optional[TrafficSummary] = None
+    timeline: Optional[np.ndarray] = None  # Theo phút, structured array (TIMELINE_DTYPE), read-only
+    anomalies: Tuple[AnomalySummary, ...] = ()  # Theo thời gian
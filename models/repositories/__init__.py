@@ -1,7 +1,7 @@
 # models/repositories/__init__.py
 from .base_repository import BaseRepository
 from .video_repository import VideoRepository
-from .detection_event_repository import DetectionEventRepository
+from .detection_event_repository import DetectionEventRepository, TIMELINE_DTYPE
 from .traffic_data_repository import TrafficDataRepository
 from .anomaly_event_repository import AnomalyEventRepository
 
@@ -10,5 +10,6 @@ __all__ = [
     'VideoRepository', 
     'DetectionEventRepository',
     'TrafficDataRepository',
-    'AnomalyEventRepository'
+    'AnomalyEventRepository',
+    'TIMELINE_DTYPE'
 ]
\ No newline at end of file
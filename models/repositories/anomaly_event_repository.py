@@ -1,12 +1,21 @@
 # models/repositories/anomaly_event_repository.py
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timedelta
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import and_, or_, desc, func, select, bindparam
 
 from dal.models import AnomalyEvent
 from .base_repository import BaseRepository
 
 
+# Các câu thống kê theo video dựng sẵn, chạy cùng nhau qua execute_batch
+_SUMMARY_STATEMENTS = tuple(
+    select(column, func.count(AnomalyEvent.id))
+    .where(AnomalyEvent.video_id == bindparam('video_id'))
+    .group_by(column)
+    for column in (AnomalyEvent.anomaly_type, AnomalyEvent.severity_level)
+)
+
+
 class AnomalyEventRepository(BaseRepository[AnomalyEvent]):
     """
     Repository for AnomalyEvent operations
@@ -247,30 +256,11 @@ class AnomalyEventRepository(BaseRepository[AnomalyEvent]):
             Summary dict with counts by type and severity
         """
         try:
-            # Count anomalies by type
-            type_counts = self.session.query(
-                AnomalyEvent.anomaly_type,
-                func.count(AnomalyEvent.id).label('count')
-            ).filter(
-                AnomalyEvent.video_id == video_id
-            ).group_by(
-                AnomalyEvent.anomaly_type
-            ).all()
-            
-            # Count by severity
-            severity_counts = self.session.query(
-                AnomalyEvent.severity_level,
-                func.count(AnomalyEvent.id).label('count')
-            ).filter(
-                AnomalyEvent.video_id == video_id
-            ).group_by(
-                AnomalyEvent.severity_level
-            ).all()
-            
-            # Total count
-            total = self.session.query(AnomalyEvent).filter(
-                AnomalyEvent.video_id == video_id
-            ).count()
+            # Đếm theo loại và theo mức độ trong một lượt, tổng = tổng theo loại
+            type_counts, severity_counts = self.execute_batch(
+                _SUMMARY_STATEMENTS, {'video_id': video_id}
+            )
+            total = sum(count for _, count in type_counts)
             
             return {
                 'total_anomalies': total,
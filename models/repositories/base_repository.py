@@ -1,5 +1,6 @@
 # models/repositories/base_repository.py
-from typing import TypeVar, Generic, List, Optional, Dict, Any
+from contextlib import contextmanager
+from typing import TypeVar, Generic, List, Optional, Dict, Any, Iterator, Sequence
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 import logging
@@ -23,6 +24,51 @@ class BaseRepository(Generic[T]):
         """Get current session"""
         return db_manager.session
     
+    @contextmanager
+    def session_scope(self) -> Iterator[Session]:
+        """
+        Group several repository writes into one transaction
+        
+        Repositories share the thread-local session, so writes made with
+        ``commit=False`` inside the scope are committed once on exit and
+        rolled back together on error. The session is kept open so entities
+        loaded inside the scope stay usable afterwards.
+        
+        Usage:
+            with repo.session_scope():
+                video_repo.update(video_id, status='completed', commit=False)
+                traffic_repo.create_or_update(video_id, commit=False, **stats)
+        """
+        session = self.session
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+    
+    def execute_batch(self, statements: Sequence, params: Optional[Dict[str, Any]] = None) -> List[list]:
+        """
+        Execute several prebuilt statements back to back on one connection
+        
+        Statements should be defined once (module/class level) with
+        ``bindparam`` placeholders so SQLAlchemy's compiled cache and the
+        driver's statement cache are reused on every call.
+        
+        Args:
+            statements: Core/ORM select statements
+            params: Bound parameter values shared by all statements
+            
+        Returns:
+            List of row lists, one per statement
+        """
+        session = self.session
+        try:
+            return [session.execute(stmt, params or {}).all() for stmt in statements]
+        except SQLAlchemyError as e:
+            self.logger.error(f"Error executing batch for {self.model_class.__name__}: {e}")
+            raise
+    
     def create(self, **kwargs) -> T:
         """
         Create new entity
@@ -81,12 +127,13 @@ class BaseRepository(Generic[T]):
             self.logger.error(f"Error getting all {self.model_class.__name__}: {e}")
             raise
     
-    def update(self, id: int, **kwargs) -> Optional[T]:
+    def update(self, id: int, commit: bool = True, **kwargs) -> Optional[T]:
         """
         Update entity
         
         Args:
             id: Entity ID
+            commit: Commit immediately; pass False inside session_scope()
             **kwargs: Attributes to update
             
         Returns:
@@ -98,6 +145,9 @@ class BaseRepository(Generic[T]):
                 for key, value in kwargs.items():
                     if hasattr(entity, key):
                         setattr(entity, key, value)
+                if not commit:
+                    self.session.flush()
+                    return entity
                 self.session.commit()
                 self.session.refresh(entity)
                 self.logger.info(f"Updated {self.model_class.__name__} with id {id}")
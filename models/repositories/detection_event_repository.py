@@ -1,14 +1,96 @@
 # models/repositories/detection_event_repository.py
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence
 from datetime import datetime
+import threading
+import numpy as np
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import func, and_, text, Integer
-from sqlalchemy.orm import Query
+from sqlalchemy.orm import Query, Session
 
 from dal.models import DetectionEvent
 from .base_repository import BaseRepository
 
 
+# Timeline dạng structured array (mỗi cột một mảng liền), xem get_traffic_flow_array
+TIMELINE_DTYPE = np.dtype([
+    ('interval', 'i4'), ('start', 'f8'), ('end', 'f8'),
+    ('car', 'i4'), ('motorbike', 'i4'), ('truck', 'i4'), ('bus', 'i4'),
+    ('total', 'i4')
+])
+
+
+def _interval_counts_query(session: Session, video_id: int, interval_seconds: int,
+                           object_type: Optional[str] = None) -> Query:
+    """Build (interval, object_type, count) query, grouped and sorted in SQL"""
+    # Sử dụng CAST để chuyển đổi timestamp_in_video / interval_seconds thành integer
+    interval_expr = func.cast(
+        DetectionEvent.timestamp_in_video / interval_seconds,
+        type_=Integer
+    ).label('interval')
+    
+    query = session.query(
+        interval_expr,
+        DetectionEvent.object_type,
+        func.count(DetectionEvent.id).label('count')
+    ).filter(
+        DetectionEvent.video_id == video_id
+    )
+    
+    if object_type:
+        query = query.filter(DetectionEvent.object_type == object_type)
+    
+    # Group + sort trong SQLite (dùng index idx_time_interval)
+    return query.group_by(
+        interval_expr, DetectionEvent.object_type
+    ).order_by(interval_expr)
+
+
+class _IntervalCountCache:
+    """
+    Interval counts keyed by (video_id, interval_seconds), shared by all
+    repository instances and threads
+    
+    Key chỉ gồm dữ liệu; truy vấn chạy trên session do người gọi truyền vào.
+    clear() tăng generation nên kết quả của truy vấn bắt đầu trước khi bị
+    xoá cache sẽ không được lưu lại.
+    """
+    
+    def __init__(self, maxsize: int = 32):
+        self._maxsize = maxsize
+        self._rows: Dict[Tuple[int, int], Tuple[Tuple[int, str, int], ...]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def get(self, session: Session, video_id: int,
+            interval_seconds: int) -> Tuple[Tuple[int, str, int], ...]:
+        """Cached rows, queried on ``session`` on a miss (immutable tuple)"""
+        key = (video_id, interval_seconds)
+        with self._lock:
+            rows = self._rows.get(key)
+            generation = self._generation
+        if rows is not None:
+            return rows
+        
+        rows = tuple(
+            (interval, obj_type, count)
+            for interval, obj_type, count in _interval_counts_query(session, video_id, interval_seconds)
+        )
+        with self._lock:
+            if generation == self._generation:
+                if len(self._rows) >= self._maxsize:
+                    self._rows.pop(next(iter(self._rows)))
+                self._rows[key] = rows
+        return rows
+    
+    def clear(self):
+        with self._lock:
+            self._rows.clear()
+            self._generation += 1
+
+
+_interval_cache = _IntervalCountCache()
+
+
 class DetectionEventRepository(BaseRepository[DetectionEvent]):
     """
     Repository for DetectionEvent operations
@@ -18,6 +100,30 @@ class DetectionEventRepository(BaseRepository[DetectionEvent]):
     def __init__(self):
         super().__init__(DetectionEvent)
     
+    def create(self, **kwargs) -> DetectionEvent:
+        """Create detection event and invalidate cached interval counts"""
+        entity = super().create(**kwargs)
+        self.invalidate_cache()
+        return entity
+    
+    def update(self, id: int, commit: bool = True, **kwargs) -> Optional[DetectionEvent]:
+        """Update detection event and invalidate cached interval counts"""
+        entity = super().update(id, commit=commit, **kwargs)
+        self.invalidate_cache()
+        return entity
+    
+    def delete(self, id: int) -> bool:
+        """Delete detection event and invalidate cached interval counts"""
+        deleted = super().delete(id)
+        self.invalidate_cache()
+        return deleted
+    
+    def bulk_create(self, entities: List[Dict]) -> List[DetectionEvent]:
+        """Create detection events and invalidate cached interval counts"""
+        created = super().bulk_create(entities)
+        self.invalidate_cache()
+        return created
+    
     def get_events_for_video(self, video_id: int, 
                             object_type: Optional[str] = None,
                             crossed_only: bool = False,
@@ -96,6 +202,29 @@ class DetectionEventRepository(BaseRepository[DetectionEvent]):
     
 # Thêm method này vào class DetectionEventRepository để sửa lỗi
 
+    def _interval_counts(self, video_id: int, interval_seconds: int,
+                         object_type: Optional[str] = None) -> Sequence[Tuple[int, str, int]]:
+        """
+        Count events per (interval, object_type) in SQL, ordered by interval
+        
+        Args:
+            video_id: Video ID
+            interval_seconds: Interval size in seconds
+            object_type: Filter by object type
+            
+        Returns:
+            Sequence of (interval, object_type, count) rows
+        """
+        if object_type is None:
+            # Truy vấn không lọc được cache, xoá cache khi có ghi mới
+            return _interval_cache.get(self.session, video_id, interval_seconds)
+        return _interval_counts_query(self.session, video_id, interval_seconds, object_type).all()
+
+    @staticmethod
+    def invalidate_cache():
+        """Xoá cache thống kê theo interval (gọi sau khi thêm/sửa/xoá detection events)"""
+        _interval_cache.clear()
+
     def get_events_by_time_interval(self, video_id: int, 
                                interval_seconds: int = 60,
                                object_type: Optional[str] = None) -> Dict[int, Dict[str, int]]:
@@ -110,34 +239,10 @@ class DetectionEventRepository(BaseRepository[DetectionEvent]):
         Returns:
             Dict with interval -> object_type -> count
         """
-        try:            
-            # Build query for interval aggregation
-            # Sử dụng CAST để chuyển đổi timestamp_in_video / interval_seconds thành integer
-            interval_expr = func.cast(
-                DetectionEvent.timestamp_in_video / interval_seconds,
-                type_=Integer
-            ).label('interval')
-            
-            query = self.session.query(
-                interval_expr,
-                DetectionEvent.object_type,
-                func.count(DetectionEvent.id).label('count')
-            ).filter(
-                DetectionEvent.video_id == video_id
-            )
-            
-            if object_type:
-                query = query.filter(DetectionEvent.object_type == object_type)
-            
-            # Group by interval and object_type
-            results = query.group_by(interval_expr, DetectionEvent.object_type).all()
-            
-            # Format results as dict
+        try:
             interval_data = {}
-            for interval, obj_type, count in results:
-                if interval not in interval_data:
-                    interval_data[interval] = {}
-                interval_data[interval][obj_type] = count
+            for interval, obj_type, count in self._interval_counts(video_id, interval_seconds, object_type):
+                interval_data.setdefault(interval, {})[obj_type] = count
             
             return interval_data
             
@@ -159,22 +264,21 @@ class DetectionEventRepository(BaseRepository[DetectionEvent]):
             List of dicts with interval info and counts
         """
         try:
-            interval_data = self.get_events_by_time_interval(video_id, interval_seconds)
-            
-            # Handle empty data
-            if not interval_data:
-                return []
-            
+            # Rows đã được sắp xếp theo interval - dựng timeline trong một lượt
             timeline = []
-            for interval, counts in sorted(interval_data.items()):
-                timeline_entry = {
-                    "interval": interval,
-                    "start_time": interval * interval_seconds,
-                    "end_time": (interval + 1) * interval_seconds,
-                    "counts": counts,
-                    "total": sum(counts.values()) if counts else 0
-                }
-                timeline.append(timeline_entry)
+            entry = None
+            for interval, obj_type, count in self._interval_counts(video_id, interval_seconds):
+                if entry is None or entry["interval"] != interval:
+                    entry = {
+                        "interval": interval,
+                        "start_time": interval * interval_seconds,
+                        "end_time": (interval + 1) * interval_seconds,
+                        "counts": {},
+                        "total": 0
+                    }
+                    timeline.append(entry)
+                entry["counts"][obj_type] = count
+                entry["total"] += count
             
             return timeline
             
@@ -183,6 +287,47 @@ class DetectionEventRepository(BaseRepository[DetectionEvent]):
             # Return empty list to prevent crashes
             return []
 
+    def get_traffic_flow_array(self, video_id: int,
+                               interval_seconds: int = 60) -> np.ndarray:
+        """
+        Get traffic flow timeline as a structured array (TIMELINE_DTYPE)
+        
+        Cùng dữ liệu với get_traffic_flow_timeline nhưng lưu theo cột,
+        phù hợp để hiển thị bảng và tính toán vector hoá (argmax, sum).
+        
+        Args:
+            video_id: Video ID
+            interval_seconds: Interval size
+            
+        Returns:
+            Structured array sorted by interval, one row per interval
+        """
+        try:
+            rows = self._interval_counts(video_id, interval_seconds)
+            if not rows:
+                return np.zeros(0, dtype=TIMELINE_DTYPE)
+            
+            # Rows đã sắp xếp theo interval - gán mỗi row vào đúng vị trí
+            intervals = np.fromiter((row[0] for row in rows), dtype=np.int32, count=len(rows))
+            unique_intervals, positions = np.unique(intervals, return_inverse=True)
+            
+            timeline = np.zeros(len(unique_intervals), dtype=TIMELINE_DTYPE)
+            timeline['interval'] = unique_intervals
+            timeline['start'] = unique_intervals * interval_seconds
+            timeline['end'] = (unique_intervals + 1) * interval_seconds
+            
+            counts = np.fromiter((row[2] for row in rows), dtype=np.int32, count=len(rows))
+            np.add.at(timeline['total'], positions, counts)
+            for obj_type in ('car', 'motorbike', 'truck', 'bus'):
+                mask = np.fromiter((row[1] == obj_type for row in rows), dtype=bool, count=len(rows))
+                timeline[obj_type][positions[mask]] = counts[mask]
+            
+            return timeline
+            
+        except Exception as e:
+            self.logger.error(f"Error getting traffic timeline array: {e}")
+            return np.zeros(0, dtype=TIMELINE_DTYPE)
+
     def get_time_based_statistics(self, video_id: int, interval_minutes: int = 1) -> List[Dict]:
         """
         Get time-based statistics for a video
@@ -258,10 +403,14 @@ class DetectionEventRepository(BaseRepository[DetectionEvent]):
         Returns:
             Number of inserted records
         """
+        if not detections:
+            return 0
+        
         try:
-            # Use bulk_insert_mappings for performance
+            # Use bulk_insert_mappings for performance - một transaction cho cả batch
             self.session.bulk_insert_mappings(DetectionEvent, detections)
             self.session.commit()
+            self.invalidate_cache()
             return len(detections)
         except Exception as e:
             self.session.rollback()
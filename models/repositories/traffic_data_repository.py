@@ -1,6 +1,6 @@
 # models/repositories/traffic_data_repository.py
 from typing import Optional, List, Dict
-from sqlalchemy import desc, func
+from sqlalchemy import bindparam, desc, func, select
 
 from dal.models import TrafficData, Video
 from .base_repository import BaseRepository
@@ -11,6 +11,9 @@ class TrafficDataRepository(BaseRepository[TrafficData]):
     Repository for TrafficData operations
     """
     
+    # Câu truy vấn dựng sẵn một lần, tham số gắn qua bindparam
+    _BY_VIDEO_ID = select(TrafficData).where(TrafficData.video_id == bindparam('video_id'))
+    
     def __init__(self):
         super().__init__(TrafficData)
     
@@ -24,16 +27,17 @@ class TrafficDataRepository(BaseRepository[TrafficData]):
         Returns:
             TrafficData or None
         """
-        return self.session.query(TrafficData).filter(
-            TrafficData.video_id == video_id
-        ).first()
+        return self.session.execute(
+            self._BY_VIDEO_ID, {'video_id': video_id}
+        ).scalars().first()
     
-    def create_or_update(self, video_id: int, **kwargs) -> TrafficData:
+    def create_or_update(self, video_id: int, commit: bool = True, **kwargs) -> TrafficData:
         """
         Create or update traffic data for a video
         
         Args:
             video_id: Video ID
+            commit: Commit immediately; pass False inside session_scope()
             **kwargs: Traffic data attributes
             
         Returns:
@@ -52,6 +56,10 @@ class TrafficDataRepository(BaseRepository[TrafficData]):
                 traffic_data = TrafficData(video_id=video_id, **kwargs)
                 self.session.add(traffic_data)
             
+            if not commit:
+                self.session.flush()
+                return traffic_data
+            
             self.session.commit()
             self.session.refresh(traffic_data)
             
@@ -168,10 +176,8 @@ class TrafficDataRepository(BaseRepository[TrafficData]):
             
             # Add percentage breakdown
             if traffic_data.total_vehicles > 0:
-                for vehicle_type, count in stats["vehicle_breakdown"].items():
-                    if vehicle_type != "total":
-                        percentage = (count / traffic_data.total_vehicles) * 100
-                        stats[f"{vehicle_type}_percentage"] = round(percentage, 2)
+                for vehicle_type, percentage in traffic_data.get_vehicle_percentages().items():
+                    stats[f"{vehicle_type}_percentage"] = round(percentage, 2)
             
             return stats
         except Exception as e:
@@ -1,11 +1,13 @@
 # models/repositories/video_repository.py
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from datetime import datetime, timedelta
-from sqlalchemy import desc, and_
+from sqlalchemy import desc, and_, delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import joinedload, selectinload
 
-from dal.models import Video
+from dal.models import Video, TrafficData
 from .base_repository import BaseRepository
+from .detection_event_repository import DetectionEventRepository
 
 
 class VideoRepository(BaseRepository[Video]):
@@ -13,6 +15,20 @@ class VideoRepository(BaseRepository[Video]):
     Repository for Video operations
     """
     
+    # Cột sort của danh sách lịch sử -> biểu thức ORDER BY
+    _PAGE_ORDER_COLUMNS = {
+        'file_name': Video.file_name,
+        'processing_date': Video.processing_timestamp,
+        'duration': Video.duration,
+        # Video chưa có traffic_data hiển thị 0 xe
+        'total_vehicles': func.coalesce(
+            select(TrafficData.total_vehicles)
+            .where(TrafficData.video_id == Video.id)
+            .scalar_subquery(),
+            0
+        ),
+    }
+    
     def __init__(self):
         super().__init__(Video)
     
@@ -41,6 +57,33 @@ class VideoRepository(BaseRepository[Video]):
             self.logger.error(f"Error getting video with data: {e}")
             raise
     
+    def get_with_details(self, video_id: int) -> Optional[Video]:
+        """
+        Get video with traffic data and anomalies for the history detail view
+        
+        Unlike get_with_all_data, detection events are not loaded - the
+        detail view only needs their per-interval aggregates.
+        
+        Args:
+            video_id: Video ID
+            
+        Returns:
+            Video with traffic_data and anomaly_events loaded
+        """
+        try:
+            return (
+                self.session.query(Video)
+                .options(
+                    joinedload(Video.traffic_data),
+                    selectinload(Video.anomaly_events)
+                )
+                .filter(Video.id == video_id)
+                .first()
+            )
+        except Exception as e:
+            self.logger.error(f"Error getting video details: {e}")
+            raise
+    
     def get_recent_videos(self, limit: int = 10, days: int = 30) -> List[Video]:
         """
         Get recently processed videos
@@ -98,6 +141,60 @@ class VideoRepository(BaseRepository[Video]):
             self.logger.error(f"Error getting completed videos: {e}")
             raise
     
+    def get_completed_videos_page(self, offset: int, limit: int,
+                                  status: str = 'completed',
+                                  search_text: Optional[str] = None,
+                                  since: Optional[datetime] = None,
+                                  order_by: str = 'processing_date',
+                                  descending: bool = True) -> Tuple[List[Video], int]:
+        """
+        Get one page of videos for the history list, filtered in SQL
+        
+        Args:
+            offset: Number of rows to skip
+            limit: Page size
+            status: Processing status to list
+            search_text: Case-insensitive filename substring
+            since: Only videos processed (or, if not processed yet, uploaded)
+                at or after this time
+            order_by: Sort column - 'file_name', 'processing_date',
+                'total_vehicles' or 'duration'
+            descending: Sort direction
+            
+        Returns:
+            Tuple of (videos on this page, total matching videos)
+        """
+        try:
+            query = self.session.query(Video).filter(Video.status == status)
+            
+            if search_text:
+                query = query.filter(Video.file_name.ilike(f"%{search_text}%"))
+            if since is not None:
+                # Video đang xử lý/lỗi chưa có processing_timestamp - lọc theo thời điểm upload
+                query = query.filter(
+                    func.coalesce(Video.processing_timestamp, Video.upload_timestamp) >= since
+                )
+            
+            total = query.count()
+            
+            # Sort trong SQL để các trang sau nối tiếp đúng thứ tự các trang đã tải
+            order_column = self._PAGE_ORDER_COLUMNS[order_by]
+            if descending:
+                ordering = (desc(order_column), desc(Video.id))
+            else:
+                ordering = (order_column, Video.id)
+            videos = (
+                query.options(joinedload(Video.traffic_data))
+                .order_by(*ordering)
+                .offset(offset)
+                .limit(limit)
+                .all()
+            )
+            return videos, total
+        except Exception as e:
+            self.logger.error(f"Error getting video page: {e}")
+            raise
+    
     def search_videos(self, search_term: str) -> List[Video]:
         """
         Search videos by filename
@@ -140,6 +237,36 @@ class VideoRepository(BaseRepository[Video]):
         
         return self.update(video_id, **update_data)
     
+    def delete(self, id: int) -> bool:
+        """
+        Delete video and all related data with a single DELETE
+        
+        detection_events, traffic_data và anomaly_events bị xoá bởi
+        ON DELETE CASCADE trong DB, không nạp các bản ghi con vào session.
+        
+        Args:
+            id: Video ID
+            
+        Returns:
+            True if deleted, False if not found
+        """
+        try:
+            result = self.session.execute(
+                delete(Video).where(Video.id == id).execution_options(synchronize_session=False)
+            )
+            self.session.commit()
+            # Detection events bị xoá theo cascade
+            DetectionEventRepository.invalidate_cache()
+            
+            if result.rowcount:
+                self.logger.info(f"Deleted Video with id {id}")
+                return True
+            return False
+        except SQLAlchemyError as e:
+            self.session.rollback()
+            self.logger.error(f"Error deleting Video with id {id}: {e}")
+            raise
+    
     def get_statistics(self) -> Dict:
         """
         Get overall video statistics
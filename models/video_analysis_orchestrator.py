@@ -25,6 +25,7 @@ from models.repositories.traffic_data_repository import TrafficDataRepository
 from models.repositories.anomaly_event_repository import AnomalyEventRepository
 from utils.config_manager import config_manager
 from utils.logger import get_logger
+from utils.helpers import pin_current_thread
 
 logger = get_logger(__name__)
 
@@ -54,6 +55,19 @@ class VideoAnalysisOrchestrator:
     Điều phối toàn bộ quá trình phân tích video TỰ ĐỘNG
     """
     
+    # Số detection events gom lại trước khi ghi xuống DB trong một transaction
+    DETECTION_BATCH_SIZE = 10_000
+    
+    # Khoảng cách tối thiểu (giây) giữa hai lần gửi progress/stats/frame lên UI
+    UI_UPDATE_INTERVAL = 0.1
+    
+    # Số buffer overlay cấp phát sẵn, dùng xoay vòng cho frame gửi lên UI.
+    # Consumer phải copy frame nếu cần giữ lâu hơn vài lần cập nhật
+    OVERLAY_RING_SIZE = 3
+    
+    # Kích thước queue giữa các stage decode -> detect -> post-process
+    PIPELINE_QUEUE_SIZE = 4
+    
     # Trong phần __init__, thêm reset() để đảm bảo state clean
     def __init__(self):
         """Initialize orchestrator với tất cả components"""
@@ -65,6 +79,7 @@ class VideoAnalysisOrchestrator:
         # Initialize components
         self.video_processor = VideoProcessor()
         self.object_detector = ObjectDetector()
+        self.object_detector.set_enabled_classes(config_manager.get('ai_model.enabled_classes'))
         self.vehicle_tracker = VehicleTracker()
         self.traffic_monitor = TrafficMonitor(self.config.get('virtual_line'))
         self.anomaly_detector = AnomalyDetector()
@@ -79,13 +94,16 @@ class VideoAnalysisOrchestrator:
         self.current_video_id: Optional[int] = None
         self.is_analyzing = False
         self.is_paused = False
-        self.should_stop = False
+        # Event thay cho cờ bool: GUI thread set, worker đọc is_set()
+        # và có thể wait() thay vì sleep khi đang pause
+        self._stop_event = Event()
         self.analysis_thread: Optional[Thread] = None
         
         # Progress tracking
-        self.progress_queue = queue.Queue()
-        self.stats_queue = queue.Queue()
-        self.frame_queue = queue.Queue(maxsize=5)  # Buffer frames
+        # Chỉ giữ bản cập nhật mới nhất - UI nhận push qua callbacks
+        self.progress_queue = queue.Queue(maxsize=1)
+        self.stats_queue = queue.Queue(maxsize=1)
+        self.frame_queue = queue.Queue(maxsize=1)
         
         # Callbacks
         self.progress_callback: Optional[Callable] = None
@@ -95,6 +113,14 @@ class VideoAnalysisOrchestrator:
         # Initialize counted IDs set
         self._counted_ids = set()
         
+        # Detection/anomaly events chờ ghi batch xuống DB
+        self._detection_buffer: List[Dict[str, Any]] = []
+        self._anomaly_buffer: List[Dict[str, Any]] = []
+        
+        # Ring buffer cho annotated frames (cấp phát khi biết kích thước frame)
+        self._overlay_ring: List[np.ndarray] = []
+        self._overlay_ring_idx = 0
+        
         logger.info("VideoAnalysisOrchestrator initialized successfully")
     
     def set_callbacks(self, 
@@ -165,7 +191,7 @@ class VideoAnalysisOrchestrator:
             # Reset state
             self.is_analyzing = True
             self.is_paused = False
-            self.should_stop = False
+            self._stop_event.clear()
             
             # Clear queues
             while not self.progress_queue.empty():
@@ -179,6 +205,7 @@ class VideoAnalysisOrchestrator:
             self.analysis_thread = Thread(
                 target=self._analyze_video_worker,
                 args=(video_path, ), 
+                name="analysis-worker",
                 daemon=True
             )
             self.analysis_thread.start()
@@ -194,7 +221,13 @@ class VideoAnalysisOrchestrator:
     def _analyze_video_worker(self, video_path: str):
         """
         Worker thread - XỬ LÝ TOÀN BỘ VIDEO TỪ ĐẦU ĐẾN CUỐI
+        
+        Pipeline 3 stage: thread decode đọc frame, thread detect chạy model
+        (cv2/torch nhả GIL nên chạy song song được), worker này làm tracking,
+        ghi DB và cập nhật UI theo đúng thứ tự frame
         """
+        pipeline_stop = Event()
+        pipeline_threads: List[Thread] = []
         try:
             # Open video
             try:
@@ -219,59 +252,73 @@ class VideoAnalysisOrchestrator:
             self._start_time = time.time()
             start_time = time.time()
             last_minute = 0
-            minute_counts = {}  # Đếm xe theo từng phút
+            current_minute_count = 0  # Số xe qua vạch trong phút hiện tại
+            anomalies_since_update = 0
+            last_ui_update = 0.0
+            current_time = 0.0
+            stats_pending = False  # Có thay đổi chưa gửi lên UI (do throttle)
+            
+            # Start decode + detect stages
+            decode_queue = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+            detect_queue = queue.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+            pipeline_threads = [
+                Thread(target=self._decode_stage, args=(decode_queue, pipeline_stop),
+                       name="analysis-decode", daemon=True),
+                Thread(target=self._detect_stage, args=(decode_queue, detect_queue, pipeline_stop),
+                       name="analysis-detect", daemon=True)
+            ]
+            # Ghim CPU trước khi start stage threads để chúng kế thừa affinity
+            self._apply_cpu_affinity()
+            for stage in pipeline_threads:
+                stage.start()
             
             # Process each frame của video
-            while not self.should_stop:
-                # Check if paused
-                while self.is_paused and not self.should_stop:
-                    time.sleep(0.1)
+            stop_event = self._stop_event
+            while not stop_event.is_set():
+                # Check if paused - wait() trả về ngay khi bị stop
+                while self.is_paused and not stop_event.wait(0.1):
+                    pass
+                if stop_event.is_set():
+                    break
                 
-                # Read next frame
-                frame_data = self.video_processor.read_frame()
-                if frame_data is None:  # End of video
+                # 1. Frame + OBJECT DETECTION từ pipeline
+                stage_item = self._pipeline_get(detect_queue, pipeline_stop)
+                if stage_item is None:  # End of video
                     break
                 
-                frame_id, timestamp, frame = frame_data
+                frame_id, timestamp, frame, detections = stage_item
                 frame_count = frame_id + 1
                 current_time = timestamp
                 current_minute = int(current_time / 60)
                 
-                # 1. OBJECT DETECTION
-                detections = self.object_detector.detect(frame)
-                
                 # 2. VEHICLE TRACKING
                 tracked_objects = self.vehicle_tracker.update_tracks(detections, current_time)
                 
                 # 3. TRAFFIC MONITORING - Đếm xe qua đường ảo
                 crossing_events = []
                 
-                # Check which vehicles crossed in this frame
-                for detection in tracked_objects:
-                    # Check if vehicle crossed the line
-                    if detection.id and detection.id not in self._counted_ids:
-                        if self.vehicle_tracker.check_line_crossing(
-                            detection.id,
-                            self.traffic_monitor.virtual_line[0],  # line start
-                            self.traffic_monitor.virtual_line[1],  # line end  
-                            self.traffic_monitor.virtual_line[2]   # direction
-                        ):
+                # Check which vehicles crossed in this frame - một lượt cho cả frame
+                candidates = [d for d in tracked_objects
+                              if d.id and d.id not in self._counted_ids]
+                if candidates:
+                    line_start, line_end, direction = self.traffic_monitor.virtual_line
+                    crossed = self.vehicle_tracker.check_line_crossings(
+                        [d.id for d in candidates], line_start, line_end, direction
+                    )
+                    for detection, hit in zip(candidates, crossed):
+                        if hit:
                             crossing_events.append({
                                 'vehicle_type': detection.class_name,
                                 'bbox': detection.bbox,
                                 'track_id': detection.id,
                                 'confidence': detection.confidence,
-                                'direction': self.traffic_monitor.virtual_line[2]
+                                'direction': direction
                             })
                             self._counted_ids.add(detection.id)
                 
-                # Lưu các sự kiện đếm xe vào database
+                # Gom các sự kiện đếm xe, ghi xuống database theo batch
                 for event in crossing_events:
-                    # LOG để debug
-                    if frame_count % 100 == 0:  # Log mỗi 100 frames
-                        logger.debug(f"Creating detection event with video_id: {self.current_video_id}")
-                        
-                    detection_event = self.detection_event_repo.create(
+                    self._detection_buffer.append(dict(
                         video_id=self.current_video_id,
                         event_id=event.get('track_id', f"evt_{frame_count}"),  # Dùng event_id
                         frame_number=frame_count,
@@ -285,7 +332,7 @@ class VideoAnalysisOrchestrator:
                         crossed_line=True,
                         crossing_direction=event.get('direction', 'unknown'),
                         lane_id=event.get('lane_id', 'main')
-                    )
+                    ))
                 
                 # 4. ANOMALY DETECTION
                 anomalies = self.anomaly_detector.detect_anomalies(
@@ -294,39 +341,67 @@ class VideoAnalysisOrchestrator:
                     current_time
                 )
                 
-                # Lưu anomaly events
+                # Gom anomaly events, ghi xuống database theo batch cùng detection events
+                if anomalies and not self.current_video_id:
+                    logger.error(f"current_video_id is None when creating anomaly event!")
+                    logger.error(f"Frame: {frame_count}, Time: {current_time}")
+                    logger.error(f"Anomalies: {anomalies}")
+                    anomalies = []
+                
                 for anomaly in anomalies:
-                    # Kiểm tra video_id trước khi tạo anomaly event
-                    if not self.current_video_id:
-                        logger.error(f"current_video_id is None when creating anomaly event!")
-                        logger.error(f"Frame: {frame_count}, Time: {current_time}")
-                        logger.error(f"Anomaly: {anomaly}")
-                        continue
-                        
-                    try:
-                        # LOG chi tiết để debug
-                        logger.debug(f"Creating anomaly event with video_id: {self.current_video_id} for anomaly: {anomaly['type']}")
-                        
-                        self.anomaly_event_repo.create(
-                            video_id=self.current_video_id,
-                            anomaly_type=anomaly['type'],
-                            severity_level=anomaly.get('severity', 'medium'),
-                            timestamp_in_video=anomaly.get('timestamp', current_time),
-                            duration=anomaly.get('duration', 0.0),
-                            detection_area=anomaly.get('area', 'main'),
-                            bbox_x=int(anomaly['bbox'][0]) if 'bbox' in anomaly else None,
-                            bbox_y=int(anomaly['bbox'][1]) if 'bbox' in anomaly else None,
-                            bbox_width=int(anomaly['bbox'][2]) if 'bbox' in anomaly else None,
-                            bbox_height=int(anomaly['bbox'][3]) if 'bbox' in anomaly else None,
-                            object_id=str(anomaly.get('object_id', '')),
-                            object_class=anomaly.get('object_class', 'unknown'),
-                            confidence_score=anomaly.get('confidence', 0.9),
-                            alert_status='active',
-                            alert_message=anomaly.get('message', f"Detected {anomaly['type']} anomaly")
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to create anomaly event: {e}")
-                        logger.error(f"video_id: {self.current_video_id}, anomaly: {anomaly}")
+                    timestamp = anomaly.get('timestamp', current_time)
+                    bbox = anomaly.get('bbox')
+                    self._anomaly_buffer.append(dict(
+                        video_id=self.current_video_id,
+                        anomaly_type=anomaly['type'],
+                        severity_level=anomaly.get('severity', 'medium'),
+                        timestamp_in_video=timestamp,
+                        duration=anomaly.get('duration', 0.0),
+                        detection_area=anomaly.get('area', 'main'),
+                        bbox_x=int(bbox[0]) if bbox is not None else None,
+                        bbox_y=int(bbox[1]) if bbox is not None else None,
+                        bbox_width=int(bbox[2]) if bbox is not None else None,
+                        bbox_height=int(bbox[3]) if bbox is not None else None,
+                        object_id=str(anomaly.get('object_id', '')),
+                        object_class=anomaly.get('object_class', 'unknown'),
+                        confidence_score=anomaly.get('confidence', 0.9),
+                        alert_status='active',
+                        alert_message=anomaly.get('message', f"Detected {anomaly['type']} anomaly")
+                    ))
+                    # Giữ detection event đi kèm như AnomalyEventRepository.create()
+                    self._detection_buffer.append(dict(
+                        video_id=self.current_video_id,
+                        frame_number=0,
+                        timestamp_in_video=timestamp,
+                        object_type='anomaly',
+                        bbox_x=0,
+                        bbox_y=0,
+                        bbox_width=0,
+                        bbox_height=0,
+                        confidence_score=1.0,
+                        crossed_line=False
+                    ))
+                
+                # Mỗi anomaly cũng thêm một detection event nên chỉ cần xét detection buffer
+                if len(self._detection_buffer) >= self.DETECTION_BATCH_SIZE:
+                    self._flush_event_buffers()
+                
+                # Đếm theo phút - thống kê từng phút được tổng hợp bằng SQL
+                # từ detection_events (get_traffic_flow_timeline), không cần giữ ở đây
+                if current_minute > last_minute:
+                    last_minute = current_minute
+                    current_minute_count = 0
+                current_minute_count += len(crossing_events)
+                anomalies_since_update += len(anomalies)
+                stats_pending = True
+                
+                # Chỉ gửi cập nhật UI tối đa ~10 lần/giây - các frame ở giữa
+                # không cần vẽ overlay hay tạo progress/stats objects
+                # Đang dừng thì không tạo cập nhật UI nữa
+                now = time.monotonic()
+                if now - last_ui_update < self.UI_UPDATE_INTERVAL or stop_event.is_set():
+                    continue
+                last_ui_update = now
                 
                 # 5. OVERLAY RESULTS on frame
                 annotated_frame = self._overlay_results(
@@ -338,11 +413,6 @@ class VideoAnalysisOrchestrator:
                 # 6. UPDATE STATISTICS
                 stats = self.traffic_monitor.get_statistics()
                 
-                # Tính thống kê theo phút
-                if current_minute > last_minute:
-                    minute_counts[last_minute] = stats['total_vehicles']
-                    last_minute = current_minute
-                
                 # Calculate processing FPS
                 elapsed = time.time() - start_time
                 processing_fps = frame_count / elapsed if elapsed > 0 else 0
@@ -358,35 +428,46 @@ class VideoAnalysisOrchestrator:
                     fps=processing_fps,
                     status='analyzing'
                 )
-                self.progress_queue.put(progress)
+                self._put_latest(self.progress_queue, progress)
                 
                 # Stats update
-                vehicle_counts = stats.get('vehicle_counts', {})
-                real_time_stats = RealTimeStats(
-                    total_vehicles=stats['total_vehicles'],
-                    vehicles_by_type=vehicle_counts,
-                    current_minute_count=len([e for e in crossing_events]),
-                    anomalies_detected=len(anomalies),
-                    processing_fps=processing_fps,
-                    video_timestamp=str(timedelta(seconds=int(current_time)))
+                real_time_stats = self._build_stats(
+                    stats, current_minute_count, anomalies_since_update,
+                    processing_fps, current_time
                 )
-                self.stats_queue.put(real_time_stats)
+                self._put_latest(self.stats_queue, real_time_stats)
+                anomalies_since_update = 0
+                stats_pending = False
                 
-                # Frame update (skip some frames to not overwhelm UI)
-                if frame_count % 3 == 0:  # Show every 3rd frame
-                    try:
-                        self.frame_queue.put_nowait(annotated_frame)
-                    except queue.Full:
-                        pass  # Skip if queue is full
+                # Frame update - chỉ giữ frame mới nhất
+                self._put_latest(self.frame_queue, annotated_frame)
                 
                 # Notify callbacks
                 if self.progress_callback:
                     self.progress_callback(progress)
                 if self.stats_callback:
                     self.stats_callback(real_time_stats)
-                if self.frame_callback and frame_count % 3 == 0:
+                if self.frame_callback:
                     self.frame_callback(annotated_frame)
             
+            # Cập nhật cuối cùng có thể đã bị throttle bỏ qua - luôn gửi thống kê cuối
+            if stats_pending and not stop_event.is_set():
+                elapsed = time.time() - start_time
+                real_time_stats = self._build_stats(
+                    self.traffic_monitor.get_statistics(), current_minute_count,
+                    anomalies_since_update, frame_count / elapsed if elapsed > 0 else 0,
+                    current_time
+                )
+                self._put_latest(self.stats_queue, real_time_stats)
+                if self.stats_callback:
+                    self.stats_callback(real_time_stats)
+            
+            # Dừng các stage trước khi đọc vị trí video khi tổng hợp
+            self._stop_pipeline(pipeline_stop, pipeline_threads)
+            
+            # Ghi nốt các events còn lại trước khi tổng hợp
+            self._flush_event_buffers()
+            
             # ANALYSIS COMPLETED - Tổng hợp kết quả cuối cùng
             self._finalize_analysis()
             
@@ -394,14 +475,165 @@ class VideoAnalysisOrchestrator:
             logger.error(f"Error in video analysis worker: {e}")
             self._handle_analysis_error(str(e))
         finally:
+            self._stop_pipeline(pipeline_stop, pipeline_threads)
+            
+            # Không mất events đã gom khi bị dừng hoặc lỗi giữa chừng
+            try:
+                self._flush_event_buffers()
+            except Exception as e:
+                logger.error(f"Failed to flush detection/anomaly events: {e}")
             self.is_analyzing = False
             self.video_processor.close_video()
     
+    @staticmethod
+    def _build_stats(stats: Dict, current_minute_count: int, anomalies: int,
+                     processing_fps: float, current_time: float) -> RealTimeStats:
+        """Tạo RealTimeStats từ thống kê của TrafficMonitor"""
+        return RealTimeStats(
+            total_vehicles=stats['total_vehicles'],
+            vehicles_by_type=stats.get('vehicle_counts', {}),
+            current_minute_count=current_minute_count,
+            anomalies_detected=anomalies,
+            processing_fps=processing_fps,
+            video_timestamp=str(timedelta(seconds=int(current_time)))
+        )
+    
+    def _decode_stage(self, out_queue: queue.Queue, stop_event: Event):
+        """Stage 1: đọc frame từ video, None khi hết video"""
+        try:
+            while not stop_event.is_set():
+                frame_data = self.video_processor.read_frame()
+                if not self._pipeline_put(out_queue, frame_data, stop_event) or frame_data is None:
+                    return
+        except Exception as e:
+            self._pipeline_put(out_queue, e, stop_event)
+    
+    def _detect_stage(self, in_queue: queue.Queue, out_queue: queue.Queue, stop_event: Event):
+        """Stage 2: chạy object detection, giữ nguyên thứ tự frame"""
+        try:
+            while True:
+                frame_data = self._pipeline_get(in_queue, stop_event)
+                if frame_data is None:
+                    self._pipeline_put(out_queue, None, stop_event)
+                    return
+                
+                frame_id, timestamp, frame = frame_data
+                detections = self.object_detector.detect(frame)
+                if not self._pipeline_put(out_queue, (frame_id, timestamp, frame, detections), stop_event):
+                    return
+        except Exception as e:
+            self._pipeline_put(out_queue, e, stop_event)
+    
+    @staticmethod
+    def _apply_cpu_affinity():
+        """
+        Ghim thread hiện tại vào các CPU trong video_processing.cpu_affinity
+        
+        Trên Linux sched_setaffinity(0) chỉ áp dụng cho thread gọi, thread tạo
+        sau đó kế thừa - GUI thread không bị ảnh hưởng. Không có config hoặc
+        nền tảng không hỗ trợ thì bỏ qua.
+        """
+        cpus = config_manager.get('video_processing.cpu_affinity')
+        try:
+            if pin_current_thread(cpus):
+                logger.info(f"Analysis pipeline pinned to CPUs: {sorted(cpus)}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not set CPU affinity {cpus}: {e}")
+    
+    @staticmethod
+    def _pipeline_put(q: queue.Queue, item: Any, stop_event: Event) -> bool:
+        """Put có back-pressure, bỏ cuộc khi pipeline bị dừng"""
+        while not stop_event.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    @staticmethod
+    def _pipeline_get(q: queue.Queue, stop_event: Event) -> Any:
+        """
+        Lấy item từ stage trước
+        
+        Returns:
+            Item, hoặc None khi hết video / pipeline bị dừng.
+            Exception từ stage trước được raise lại ở đây
+        """
+        while True:
+            try:
+                item = q.get(timeout=0.1)
+            except queue.Empty:
+                if stop_event.is_set():
+                    return None
+                continue
+            if isinstance(item, Exception):
+                raise item
+            return item
+    
+    @staticmethod
+    def _stop_pipeline(stop_event: Event, threads: List[Thread]):
+        """Dừng và chờ các stage thread (gọi nhiều lần không sao)"""
+        stop_event.set()
+        for stage in threads:
+            stage.join(timeout=5)
+    
+    def _flush_detection_buffer(self):
+        """Ghi toàn bộ detection events đang gom trong một transaction"""
+        if not self._detection_buffer:
+            return
+        
+        rows = self._detection_buffer
+        self._detection_buffer = []
+        inserted = self.detection_event_repo.bulk_insert_detections(rows)
+        logger.debug(f"Flushed {inserted} detection events for video_id: {self.current_video_id}")
+    
+    def _flush_anomaly_buffer(self):
+        """Ghi toàn bộ anomaly events đang gom trong một transaction"""
+        if not self._anomaly_buffer:
+            return
+        
+        rows = self._anomaly_buffer
+        self._anomaly_buffer = []
+        inserted = self.anomaly_event_repo.bulk_insert_anomalies(rows)
+        logger.debug(f"Flushed {inserted} anomaly events for video_id: {self.current_video_id}")
+    
+    def _flush_event_buffers(self):
+        """Ghi detection và anomaly events đang gom (anomaly vẫn được ghi nếu detection lỗi)"""
+        try:
+            self._flush_detection_buffer()
+        finally:
+            self._flush_anomaly_buffer()
+    
+    @staticmethod
+    def _put_latest(q: queue.Queue, item: Any):
+        """Đưa item vào queue, bỏ bản cũ nếu queue đã đầy"""
+        try:
+            q.put_nowait(item)
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            q.put_nowait(item)
+    
+    def _next_overlay_buffer(self, frame: np.ndarray) -> np.ndarray:
+        """Copy frame vào slot kế tiếp của ring buffer, tránh cấp phát mới mỗi lần"""
+        ring = self._overlay_ring
+        if not ring or ring[0].shape != frame.shape or ring[0].dtype != frame.dtype:
+            ring[:] = [np.empty_like(frame) for _ in range(self.OVERLAY_RING_SIZE)]
+            self._overlay_ring_idx = 0
+        
+        buffer = ring[self._overlay_ring_idx]
+        self._overlay_ring_idx = (self._overlay_ring_idx + 1) % self.OVERLAY_RING_SIZE
+        np.copyto(buffer, frame)
+        return buffer
+    
     def _overlay_results(self, frame: np.ndarray, 
                             tracked_objects: List[Any],  # List of Detection objects
                             anomalies: List[Dict]) -> np.ndarray:
         """Vẽ kết quả detection lên frame"""
-        annotated = frame.copy()
+        annotated = self._next_overlay_buffer(frame)
         
         # Draw tracked vehicles
         for obj in tracked_objects:
@@ -462,26 +694,30 @@ class VideoAnalysisOrchestrator:
             final_stats = self.traffic_monitor.get_statistics()
             
             # Update video record - cần đảm bảo video_id đúng
+            # Video + traffic data ghi trong cùng một transaction (một commit)
             if self.current_video_id:
-                self.video_repo.update(
-                    self.current_video_id,  # Đã là integer ID
-                    status='completed',
-                    processing_timestamp=datetime.now(),
-                    processing_duration=time.time() - self._start_time if hasattr(self, '_start_time') else 0
-                )
-                
-                # Save aggregated traffic data
                 stats = final_stats.get('vehicle_counts', {})
-                self.traffic_data_repo.create_or_update(
-                    self.current_video_id,
-                    total_vehicles=final_stats.get('total_vehicles', 0),
-                    car_count=stats.get('car', 0),
-                    motorbike_count=stats.get('motorbike', 0),
-                    truck_count=stats.get('truck', 0),
-                    bus_count=stats.get('bus', 0),
-                    avg_speed=0.0,  # Not implemented yet
-                    congestion_level='low'  # Simplified
-                )
+                with self.video_repo.session_scope():
+                    self.video_repo.update(
+                        self.current_video_id,  # Đã là integer ID
+                        commit=False,
+                        status='completed',
+                        processing_timestamp=datetime.now(),
+                        processing_duration=time.time() - self._start_time if hasattr(self, '_start_time') else 0
+                    )
+                    
+                    # Save aggregated traffic data
+                    self.traffic_data_repo.create_or_update(
+                        self.current_video_id,
+                        commit=False,
+                        total_vehicles=final_stats.get('total_vehicles', 0),
+                        car_count=stats.get('car', 0),
+                        motorbike_count=stats.get('motorbike', 0),
+                        truck_count=stats.get('truck', 0),
+                        bus_count=stats.get('bus', 0),
+                        avg_speed=0.0,  # Not implemented yet
+                        congestion_level='low'  # Simplified
+                    )
             else:
                 logger.error("No current_video_id when finalizing analysis!")
             
@@ -535,6 +771,11 @@ class VideoAnalysisOrchestrator:
         except Exception as e:
             logger.error(f"Error handling analysis error: {e}")
     
+    @property
+    def should_stop(self) -> bool:
+        """True khi đã yêu cầu dừng phân tích"""
+        return self._stop_event.is_set()
+    
     def pause_analysis(self):
         """Tạm dừng phân tích"""
         if self.is_analyzing and not self.is_paused:
@@ -550,7 +791,7 @@ class VideoAnalysisOrchestrator:
     def stop_analysis(self):
         """Dừng phân tích hoàn toàn"""
         if self.is_analyzing:
-            self.should_stop = True
+            self._stop_event.set()
             self.is_paused = False
             if self.analysis_thread:
                 self.analysis_thread.join(timeout=5)
@@ -635,7 +876,10 @@ class VideoAnalysisOrchestrator:
         self.current_video_id = None
         self.is_analyzing = False
         self.is_paused = False
-        self.should_stop = False
+        self._stop_event.clear()
+        
+        self._detection_buffer = []
+        self._anomaly_buffer = []
         
         # Reset counted IDs cho traffic monitor
         if hasattr(self, '_counted_ids'):
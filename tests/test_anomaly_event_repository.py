@@ -191,6 +191,32 @@ class TestAnomalyEventRepository(BaseTestCase):
         self.assertEqual(counts["stopped_vehicle"]["critical"], 1)
         self.assertEqual(counts["obstacle"]["medium"], 1)
     
+    def test_get_summary_by_video(self):
+        """Test anomaly summary counts by type and severity"""
+        test_data = [
+            ("pedestrian", "medium"),
+            ("pedestrian", "high"),
+            ("animal", "medium"),
+        ]
+        
+        for atype, severity in test_data:
+            self.repo.create(
+                video_id=self.video.id,
+                anomaly_type=atype,
+                severity_level=severity,
+                timestamp_in_video=10.0
+            )
+        
+        summary = self.repo.get_summary_by_video(self.video.id)
+        
+        self.assertEqual(summary["total_anomalies"], 3)
+        self.assertEqual(summary["by_type"], {"pedestrian": 2, "animal": 1})
+        self.assertEqual(summary["by_severity"], {"medium": 2, "high": 1})
+        
+        # Video khác không có bất thường
+        other = self.create_test_video()
+        self.assertEqual(self.repo.get_summary_by_video(other.id)["total_anomalies"], 0)
+    
     def test_get_active_anomalies_across_videos(self):
         """Test getting all active anomalies across all videos"""
         # Create anomalies for multiple videos
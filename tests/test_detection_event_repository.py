@@ -0,0 +1,176 @@
+# tests/test_detection_event_repository.py
+import unittest
+from sqlalchemy import update, text
+
+from test_base import BaseTestCase
+from dal.database import db_manager
+from models.repositories import DetectionEventRepository, TIMELINE_DTYPE
+from dal.models import DetectionEvent
+
+
+class TestDetectionEventRepository(BaseTestCase):
+    """Test DetectionEventRepository batch inserts and time-based queries"""
+    
+    def setUp(self):
+        super().setUp()
+        self.repo = DetectionEventRepository()
+        # Timeline cache is module-level, do not leak between test databases
+        DetectionEventRepository.invalidate_cache()
+        # Create test video
+        self.video = self.create_test_video()
+        
+    def _make_rows(self, events):
+        """Build detection mappings from (timestamp, object_type) pairs"""
+        return [
+            {
+                'video_id': self.video.id,
+                'event_id': str(i),
+                'frame_number': int(timestamp * 30),
+                'timestamp_in_video': timestamp,
+                'object_type': object_type,
+                'crossed_line': True
+            }
+            for i, (timestamp, object_type) in enumerate(events)
+        ]
+        
+    def test_bulk_insert_detections(self):
+        """Test inserting a batch of detection events in one call"""
+        rows = self._make_rows([(1.0, 'car'), (2.0, 'car'), (3.0, 'truck')])
+        
+        inserted = self.repo.bulk_insert_detections(rows)
+        
+        self.assertEqual(inserted, 3)
+        self.assertEqual(
+            self.session.query(DetectionEvent).filter_by(video_id=self.video.id).count(),
+            3
+        )
+        
+    def test_bulk_insert_empty_batch(self):
+        """Test empty batch is a no-op"""
+        self.assertEqual(self.repo.bulk_insert_detections([]), 0)
+        
+    def test_traffic_flow_timeline(self):
+        """Test per-minute timeline aggregation"""
+        rows = self._make_rows([
+            (5.0, 'car'), (30.0, 'car'), (59.0, 'motorbike'),
+            (61.0, 'car'), (130.0, 'bus')
+        ])
+        self.repo.bulk_insert_detections(rows)
+        
+        timeline = self.repo.get_traffic_flow_timeline(self.video.id, 60)
+        
+        self.assertEqual([entry['interval'] for entry in timeline], [0, 1, 2])
+        self.assertEqual(timeline[0]['counts'], {'car': 2, 'motorbike': 1})
+        self.assertEqual(timeline[0]['total'], 3)
+        self.assertEqual(timeline[1]['total'], 1)
+        self.assertEqual(timeline[2]['counts'], {'bus': 1})
+
+        
+    def test_timeline_cache_invalidated_on_insert(self):
+        """Test cached timeline is refreshed after a new batch is written"""
+        self.repo.bulk_insert_detections(self._make_rows([(5.0, 'car')]))
+        self.assertEqual(self.repo.get_traffic_flow_timeline(self.video.id, 60)[0]['total'], 1)
+        
+        self.repo.bulk_insert_detections(self._make_rows([(10.0, 'car')]))
+        self.assertEqual(self.repo.get_traffic_flow_timeline(self.video.id, 60)[0]['total'], 2)
+        
+    def test_interval_cache_invalidated_by_every_writer(self):
+        """Test update, delete and cascading video delete refresh cached counts"""
+        from models.repositories import VideoRepository
+        self.repo.bulk_insert_detections(self._make_rows([(5.0, 'car'), (10.0, 'car')]))
+        self.assertEqual(self.repo.get_traffic_flow_timeline(self.video.id, 60)[0]['total'], 2)
+        
+        first, second = self.repo.get_events_for_video(self.video.id)
+        self.repo.update(first.id, timestamp_in_video=65.0)
+        self.assertEqual([e['total'] for e in self.repo.get_traffic_flow_timeline(self.video.id, 60)], [1, 1])
+        
+        self.repo.delete(second.id)
+        self.assertEqual([e['total'] for e in self.repo.get_traffic_flow_timeline(self.video.id, 60)], [1])
+        
+        video_id = self.video.id
+        VideoRepository().delete(video_id)
+        self.assertEqual(self.repo.get_traffic_flow_timeline(video_id, 60), [])
+        
+    def test_timeline_returns_fresh_entries(self):
+        """Test mutating a returned timeline does not affect later calls"""
+        self.repo.bulk_insert_detections(self._make_rows([(5.0, 'car')]))
+        timeline = self.repo.get_traffic_flow_timeline(self.video.id, 60)
+        timeline[0]['counts']['car'] = 100
+        
+        again = self.repo.get_traffic_flow_timeline(self.video.id, 60)
+        self.assertEqual(again[0]['counts'], {'car': 1})
+
+    def test_traffic_flow_array(self):
+        """Test structured-array timeline matches the dict timeline"""
+        rows = self._make_rows([
+            (5.0, 'car'), (30.0, 'car'), (59.0, 'motorbike'),
+            (61.0, 'car'), (130.0, 'bus'), (140.0, 'person')
+        ])
+        self.repo.bulk_insert_detections(rows)
+        
+        timeline = self.repo.get_traffic_flow_array(self.video.id, 60)
+        
+        self.assertEqual(timeline.dtype, TIMELINE_DTYPE)
+        self.assertEqual(timeline['interval'].tolist(), [0, 1, 2])
+        self.assertEqual(timeline['start'].tolist(), [0.0, 60.0, 120.0])
+        self.assertEqual(timeline['car'].tolist(), [2, 1, 0])
+        self.assertEqual(timeline['motorbike'].tolist(), [1, 0, 0])
+        self.assertEqual(timeline['bus'].tolist(), [0, 0, 1])
+        # Total gồm cả loại không có cột riêng, giống get_traffic_flow_timeline
+        self.assertEqual(timeline['total'].tolist(), [3, 1, 2])
+        
+    def test_traffic_flow_array_empty(self):
+        """Test empty video yields an empty structured array"""
+        timeline = self.repo.get_traffic_flow_array(self.video.id, 60)
+        self.assertEqual(timeline.size, 0)
+        self.assertEqual(timeline.dtype, TIMELINE_DTYPE)
+        
+    def test_bbox_and_center(self):
+        """Test bbox/center on loaded events follow bbox column changes"""
+        rows = self._make_rows([(1.0, 'car'), (2.0, 'car')])
+        rows[0].update(bbox_x=10, bbox_y=20, bbox_width=30, bbox_height=40)
+        self.repo.bulk_insert_detections(rows)
+        self.session.expire_all()
+        
+        with_box, without_box = self.session.query(DetectionEvent).order_by(DetectionEvent.id).all()
+        self.assertEqual(with_box.bbox, (10, 20, 30, 40))
+        self.assertEqual(with_box.center, (25, 40))
+        self.assertIsNone(without_box.center)
+        
+        with_box.bbox_x = 0
+        self.assertEqual(with_box.bbox, (0, 20, 30, 40))
+        self.assertEqual(with_box.center, (15, 40))
+        self.session.commit()
+        
+        # Cập nhật bằng SQL rồi refresh - bbox/center phải theo giá trị mới
+        self.session.execute(
+            update(DetectionEvent).where(DetectionEvent.id == with_box.id).values(bbox_x=100)
+        )
+        self.session.commit()
+        self.session.refresh(with_box)
+        self.assertEqual(with_box.bbox, (100, 20, 30, 40))
+        self.assertEqual(with_box.center, (115, 40))
+        
+    def test_existing_db_gets_crossing_index(self):
+        """Test create_all_tables upgrades the crossing index of an existing DB"""
+        self.session.commit()
+        list_indexes = text(
+            "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='detection_events'"
+        )
+        
+        # DB tạo từ phiên bản trước: còn index cũ, chưa có covering index
+        with db_manager.engine.begin() as conn:
+            conn.execute(text("DROP INDEX idx_video_crossed_type_ts"))
+            conn.execute(text("CREATE INDEX idx_video_crossed ON detection_events (video_id, crossed_line)"))
+        
+        # Chạy lại nhiều lần không lỗi
+        db_manager.create_all_tables()
+        db_manager.create_all_tables()
+        
+        with db_manager.engine.connect() as conn:
+            indexes = {row[0] for row in conn.execute(list_indexes)}
+        self.assertIn('idx_video_crossed_type_ts', indexes)
+        self.assertNotIn('idx_video_crossed', indexes)
+
+if __name__ == '__main__':
+    unittest.main()
\ No newline at end of file
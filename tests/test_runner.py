@@ -49,11 +49,13 @@ def run_repository_tests():
     from test_video_repository import TestVideoRepository
     from test_traffic_data_repository import TestTrafficDataRepository
     from test_anomaly_event_repository import TestAnomalyEventRepository
+    from test_detection_event_repository import TestDetectionEventRepository
     
     suite = unittest.TestSuite()
     
     # Add repository tests
-    for test_class in [TestVideoRepository, TestTrafficDataRepository, TestAnomalyEventRepository]:
+    for test_class in [TestVideoRepository, TestTrafficDataRepository, TestAnomalyEventRepository,
+                       TestDetectionEventRepository]:
         tests = unittest.TestLoader().loadTestsFromTestCase(test_class)
         suite.addTests(tests)
     
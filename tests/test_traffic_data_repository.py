@@ -308,6 +308,27 @@ class TestTrafficDataRepository(BaseTestCase):
         self.assertEqual(stats["total_vehicles"], 0)
         self.assertEqual(stats.get("car_percentage", 0), 0)
         
+    def test_get_vehicle_percentages(self):
+        """Test percentages computed in SQL, zero total yields 0.0"""
+        self.repo.create(
+            video_id=self.video.id,
+            total_vehicles=200,
+            car_count=50,
+            motorbike_count=150,
+            truck_count=0,
+            bus_count=0
+        )
+        
+        pct = self.repo.get_by_video_id(self.video.id).get_vehicle_percentages()
+        self.assertEqual(pct["car"], 25.0)
+        self.assertEqual(pct["motorbike"], 75.0)
+        self.assertEqual(pct["truck"], 0.0)
+        
+        self.repo.update(self.repo.get_by_video_id(self.video.id).id,
+                         total_vehicles=0, car_count=0, motorbike_count=0)
+        pct = self.repo.get_by_video_id(self.video.id).get_vehicle_percentages()
+        self.assertEqual(pct, {"car": 0.0, "motorbike": 0.0, "truck": 0.0, "bus": 0.0})
+        
     def test_timestamps(self):
         """Test created_at and updated_at timestamps are properly set"""
         # Create record
@@ -337,6 +358,43 @@ class TestTrafficDataRepository(BaseTestCase):
         
         # That's it! For a demo app, we don't need microsecond precision testing
 
+    def test_session_scope_single_commit(self):
+        """Test deferred writes inside session_scope are committed together"""
+        from models.repositories import VideoRepository
+        video_repo = VideoRepository()
+        
+        with self.repo.session_scope():
+            video_repo.update(self.video.id, commit=False, status='processing')
+            self.repo.create_or_update(self.video.id, commit=False, total_vehicles=42)
+        
+        self.session.expire_all()
+        self.assertEqual(self.session.get(Video, self.video.id).status, 'processing')
+        self.assertEqual(self.repo.get_by_video_id(self.video.id).total_vehicles, 42)
+    
+    def test_session_scope_rollback(self):
+        """Test session_scope rolls back every deferred write on error"""
+        with self.assertRaises(RuntimeError):
+            with self.repo.session_scope():
+                self.repo.create_or_update(self.video.id, commit=False, total_vehicles=42)
+                raise RuntimeError("boom")
+        
+        self.assertIsNone(self.repo.get_by_video_id(self.video.id))
+    
+    def test_db_session_scope_keeps_thread_session(self):
+        """Test db_manager.session_scope leaves the thread-local session open"""
+        from dal.database import db_manager
+        video_id = self.video.id
+        video = self.session.get(Video, video_id)
+        self.session.commit()
+        
+        with db_manager.session_scope() as session:
+            self.assertIsNot(session, self.session)
+            session.get(Video, video_id).status = 'processing'
+        
+        self.assertIn(video, self.session)
+        self.session.refresh(video)
+        self.assertEqual(video.status, 'processing')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -184,6 +184,33 @@ class TestVehicleTracker(BaseTestCase):
             self.tracker.check_line_crossing(car_id, line_start, line_end, direction)
         )
     
+    def test_batch_line_crossing(self):
+        """Test check_line_crossings matches per-object checks for a whole frame"""
+        line_start = (400, 100)
+        line_end = (400, 500)
+        
+        # Hai xe đi sang phải qua line, một xe đi sang trái, một xe không tới line
+        tracks = {
+            "right_1": [(380, 150), (420, 150)],
+            "right_2": [(390, 400), (410, 410)],
+            "left": [(420, 300), (380, 300)],
+            "short": [(100, 300), (150, 300)],
+        }
+        for obj_id, points in tracks.items():
+            for t, (x, y) in enumerate(points):
+                self.tracker._update_history(obj_id, (x, y), float(t))
+        
+        ids = ["right_1", "left", "short", "right_2", "right_1", "missing"]
+        crossed = self.tracker.check_line_crossings(ids, line_start, line_end, "right")
+        
+        # ID lặp lại chỉ được đếm một lần
+        self.assertEqual(crossed.tolist(), [True, False, False, True, False, False])
+        self.assertEqual(self.tracker.counted_ids, {"right_1", "right_2"})
+        
+        crossed = self.tracker.check_line_crossings(ids, line_start, line_end, "right")
+        self.assertFalse(crossed.any())
+        self.assertTrue(self.tracker.check_line_crossing("left", line_start, line_end, "left"))
+    
     def test_movement_info_calculation(self):
         """Test movement info (speed, distance, stopped) calculation"""
         # Stationary object
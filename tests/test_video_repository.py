@@ -78,6 +78,28 @@ class TestVideoRepository(BaseTestCase):
         retrieved = self.repo.get_by_id(video_id)
         self.assertIsNone(retrieved)
         
+    def test_delete_video_cascades(self):
+        """Test deleting a video removes its related rows via ON DELETE CASCADE"""
+        from dal.models import TrafficData, DetectionEvent, AnomalyEvent
+        
+        video = self.create_test_video()
+        video_id = video.id
+        self.session.add_all([
+            TrafficData(video_id=video_id, total_vehicles=1, car_count=1),
+            DetectionEvent(video_id=video_id, event_id='e1', frame_number=1,
+                           timestamp_in_video=0.1, object_type='car'),
+            AnomalyEvent(video_id=video_id, anomaly_type='pedestrian',
+                         timestamp_in_video=0.1)
+        ])
+        self.session.commit()
+        
+        self.assertTrue(self.repo.delete(video_id))
+        
+        for model in (TrafficData, DetectionEvent, AnomalyEvent):
+            self.assertEqual(
+                self.session.query(model).filter_by(video_id=video_id).count(), 0
+            )
+        
     def test_delete_non_existent(self):
         """Test deleting non-existent video"""
         result = self.repo.delete(9999)
@@ -170,6 +192,100 @@ class TestVideoRepository(BaseTestCase):
         self.assertIsNotNone(video_with_stats.traffic_data)
         self.assertEqual(video_with_stats.traffic_data.total_vehicles, 100)
         
+    def test_get_completed_videos_page(self):
+        """Test paginated history query with SQL-side filters"""
+        from datetime import datetime, timedelta
+        now = datetime.now()
+        
+        self.create_test_video(file_name="pending.mp4", status="pending")
+        for i in range(5):
+            self.create_test_video(
+                file_name=f"road_{i}.mp4",
+                status="completed",
+                processing_timestamp=now - timedelta(days=i)
+            )
+        self.create_test_video(
+            file_name="old_road.mp4",
+            status="completed",
+            processing_timestamp=now - timedelta(days=60)
+        )
+        
+        # First page - newest first, total counts every match
+        page, total = self.repo.get_completed_videos_page(0, 2)
+        self.assertEqual(total, 6)
+        self.assertEqual([v.file_name for v in page], ["road_0.mp4", "road_1.mp4"])
+        
+        # Last page is partial
+        page, total = self.repo.get_completed_videos_page(4, 2)
+        self.assertEqual([v.file_name for v in page], ["road_4.mp4", "old_road.mp4"])
+        
+        # Filters compose with pagination
+        page, total = self.repo.get_completed_videos_page(
+            0, 10, search_text="OLD", since=now - timedelta(days=90)
+        )
+        self.assertEqual(total, 1)
+        page, total = self.repo.get_completed_videos_page(
+            0, 10, since=now - timedelta(days=30)
+        )
+        self.assertEqual(total, 5)
+        
+        page, total = self.repo.get_completed_videos_page(0, 10, status="pending")
+        self.assertEqual([v.file_name for v in page], ["pending.mp4"])
+        
+    def test_get_videos_page_by_status(self):
+        """Test every history status filter returns its videos with a date filter"""
+        now = datetime.now()
+        self.create_test_video(file_name="done.mp4", status="completed",
+                               processing_timestamp=now)
+        # Video đang xử lý và lỗi không có processing_timestamp
+        self.create_test_video(file_name="running.mp4", status="processing",
+                               upload_timestamp=now)
+        self.create_test_video(file_name="broken.mp4", status="error",
+                               upload_timestamp=now)
+        self.create_test_video(file_name="old_broken.mp4", status="error",
+                               upload_timestamp=now - timedelta(days=60))
+        
+        since = now - timedelta(days=30)
+        for status, expected in [("completed", ["done.mp4"]),
+                                 ("processing", ["running.mp4"]),
+                                 ("error", ["broken.mp4"])]:
+            with self.subTest(status=status):
+                page, total = self.repo.get_completed_videos_page(0, 10, status=status, since=since)
+                self.assertEqual(total, len(expected))
+                self.assertEqual([v.file_name for v in page], expected)
+        
+    def test_get_videos_page_sorted(self):
+        """Test history pages are sorted in SQL, across pages"""
+        from dal.models import TrafficData
+        
+        now = datetime.now()
+        a = self.create_test_video(file_name="a.mp4", duration=30.0,
+                                   processing_timestamp=now - timedelta(hours=1))
+        b = self.create_test_video(file_name="b.mp4", duration=10.0,
+                                   processing_timestamp=now - timedelta(hours=3))
+        self.create_test_video(file_name="c.mp4", duration=20.0,
+                               processing_timestamp=now - timedelta(hours=2))
+        self.session.add_all([
+            TrafficData(video_id=a.id, total_vehicles=5),
+            TrafficData(video_id=b.id, total_vehicles=9),
+        ])
+        self.session.commit()
+        
+        for order_by, descending, expected in [
+                ("processing_date", True, ["a.mp4", "c.mp4", "b.mp4"]),
+                ("file_name", False, ["a.mp4", "b.mp4", "c.mp4"]),
+                ("duration", True, ["a.mp4", "c.mp4", "b.mp4"]),
+                # c.mp4 chưa có traffic_data - tính là 0 xe
+                ("total_vehicles", True, ["b.mp4", "a.mp4", "c.mp4"])]:
+            with self.subTest(order_by=order_by, descending=descending):
+                names = []
+                for offset in range(3):
+                    page, total = self.repo.get_completed_videos_page(
+                        offset, 1, order_by=order_by, descending=descending)
+                    names.extend(v.file_name for v in page)
+                self.assertEqual(total, 3)
+                self.assertEqual(names, expected)
+        
     def test_search_videos(self):
         """Test searching videos by filename"""
         # Create videos
@@ -277,6 +393,30 @@ class TestVideoRepository(BaseTestCase):
         self.assertEqual(len(loaded.detection_events), 3)
         self.assertEqual(len(loaded.anomaly_events), 1)
         
+    def test_get_with_details(self):
+        """Test detail view loading: traffic data and anomalies, no detections"""
+        from sqlalchemy import inspect
+        from dal.models import TrafficData, AnomalyEvent
+        video = self.create_test_video()
+        self.session.add(TrafficData(video_id=video.id, total_vehicles=20))
+        self.session.add(AnomalyEvent(
+            video_id=video.id,
+            anomaly_type="animal",
+            timestamp_in_video=10.0
+        ))
+        self.session.commit()
+        self.session.expire_all()
+        
+        loaded = self.repo.get_with_details(video.id)
+        
+        state = inspect(loaded)
+        self.assertNotIn('traffic_data', state.unloaded)
+        self.assertNotIn('anomaly_events', state.unloaded)
+        self.assertIn('detection_events', state.unloaded)
+        self.assertEqual(loaded.traffic_data.total_vehicles, 20)
+        self.assertEqual(len(loaded.anomaly_events), 1)
+        self.assertIsNone(self.repo.get_with_details(9999))
+        
     def test_bulk_create(self):
         """Test bulk creating videos"""
         video_data = [
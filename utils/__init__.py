@@ -11,7 +11,10 @@ from .helpers import (
     get_video_info,
     generate_export_filename,
     calculate_iou,
-    point_in_polygon
+    point_in_polygon,
+    pin_current_thread,
+    apply_ffmpeg_capture_options,
+    apply_opencv_threads
 )
 
 __all__ = [
@@ -34,5 +37,8 @@ __all__ = [
     'get_video_info',
     'generate_export_filename',
     'calculate_iou',
-    'point_in_polygon'
+    'point_in_polygon',
+    'pin_current_thread',
+    'apply_ffmpeg_capture_options',
+    'apply_opencv_threads'
 ]
\ No newline at end of file
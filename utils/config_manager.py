@@ -66,7 +66,15 @@ class ConfigManager:
             "video_processing": {
                 "batch_size": 100,
                 "save_interval": 30,  # frames
-                "max_processing_threads": 2
+                "max_processing_threads": 2,
+                "opencv_threads": 2,  # thread pool chung của OpenCV (resize, vẽ, ...), 0 = tắt
+                "hw_acceleration": False,  # decode video bằng GPU (NVDEC/VAAPI/D3D11) nếu có
+                "hw_device": -1,  # GPU index cho hw decode, -1 = mặc định
+                # Tùy chọn FFmpeg khi mở video ('key;value|...', vd. "probesize;32768|analyzeduration;0"),
+                # áp dụng một lần khi khởi động, "" = mặc định của FFmpeg
+                "ffmpeg_capture_options": "",
+                "cpu_affinity": None,  # list CPU id cho pipeline phân tích (Linux), None = không ghim
+                "playback_cpu_affinity": None  # list CPU id cho thread phát video (Linux)
             },
             
             # AI Model settings
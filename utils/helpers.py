@@ -1,5 +1,7 @@
 # utils/helpers.py
 import os
+import math
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Union, Tuple, Optional
@@ -32,9 +34,16 @@ def format_duration(seconds: float) -> str:
     Returns:
         Formatted string
     """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
+    # Chỉ phần giây nguyên ảnh hưởng kết quả - cache theo số giây
+    return _format_whole_seconds(math.floor(seconds))
+
+
+@lru_cache(maxsize=4096)
+def _format_whole_seconds(seconds: int) -> str:
+    """Format whole seconds to HH:MM:SS (cached, called every UI update)"""
+    hours = seconds // 3600
+    minutes = (seconds % 3600) // 60
+    secs = seconds % 60
     return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
@@ -51,10 +60,16 @@ def format_timestamp(timestamp: Union[float, datetime]) -> str:
     if isinstance(timestamp, float):
         return format_duration(timestamp)
     elif isinstance(timestamp, datetime):
-        return timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        return _format_datetime(timestamp)
     return str(timestamp)
 
 
+@lru_cache(maxsize=4096)
+def _format_datetime(timestamp: datetime) -> str:
+    """Format datetime (cached - processing_timestamp của video lặp lại mỗi lần hiển thị)"""
+    return timestamp.strftime("%Y-%m-%d %H:%M:%S")
+
+
 def parse_resolution(resolution: str) -> Tuple[int, int]:
     """
     Parse resolution string to tuple
@@ -226,4 +241,58 @@ def point_in_polygon(point: Tuple[float, float],
                         inside = not inside
         p1x, p1y = p2x, p2y
     
-    return inside
\ No newline at end of file
+    return inside
+
+
+def pin_current_thread(cpus) -> bool:
+    """
+    Ghim thread đang chạy vào các CPU cho trước (Linux)
+    
+    sched_setaffinity(0) chỉ áp dụng cho thread gọi, thread tạo sau đó kế thừa.
+    
+    Args:
+        cpus: Iterable CPU id, rỗng/None = không ghim
+        
+    Returns:
+        True if affinity was applied
+        
+    Raises:
+        OSError, ValueError: CPU id không hợp lệ
+    """
+    if not cpus or not hasattr(os, 'sched_setaffinity'):
+        return False
+    os.sched_setaffinity(0, set(cpus))
+    return True
+
+
+def apply_ffmpeg_capture_options(options: str) -> bool:
+    """
+    Đặt OPENCV_FFMPEG_CAPTURE_OPTIONS cho mọi VideoCapture FFmpeg mở sau đó
+    
+    Gọi một lần khi khởi động, trước khi mở video. Giá trị người dùng đã
+    export được giữ và được ưu tiên (nối sau).
+    
+    Args:
+        options: 'key;value|key;value', rỗng = giữ mặc định của FFmpeg
+        
+    Returns:
+        True if options were applied
+    """
+    if not options:
+        return False
+    previous = os.environ.get("OPENCV_FFMPEG_CAPTURE_OPTIONS")
+    os.environ["OPENCV_FFMPEG_CAPTURE_OPTIONS"] = f"{options}|{previous}" if previous else options
+    return True
+
+
+def apply_opencv_threads(num_threads: int):
+    """
+    Giới hạn thread pool chung của OpenCV (resize, vẽ, ...)
+    
+    Gọi một lần khi khởi động, sau khi đã load config - không tranh CPU với
+    detector/tracker khi phân tích.
+    
+    Args:
+        num_threads: Số thread, 0 = tắt thread pool, âm = mặc định của OpenCV
+    """
+    cv2.setNumThreads(int(num_threads))
\ No newline at end of file
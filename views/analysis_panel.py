@@ -29,10 +29,27 @@ class AnalysisPanel(QWidget):
     resume_analysis_requested = pyqtSignal()
     stop_analysis_requested = pyqtSignal()
     
+    # Trạng thái các nút điều khiển theo trạng thái phân tích:
+    # tên nút -> enabled, text nút pause đi kèm
+    _UI_STATES = {
+        'idle': ({'btn_start': True, 'btn_pause': False, 'btn_stop': False}, "⏸ Tạm dừng"),
+        'running': ({'btn_start': False, 'btn_pause': True, 'btn_stop': True}, "⏸ Tạm dừng"),
+        'paused': ({'btn_start': False, 'btn_pause': True, 'btn_stop': True}, "▶ Tiếp tục"),
+    }
+    
+    # Dòng tổng kết thêm vào danh sách cảnh báo khi phân tích xong
+    _SUMMARY_TEMPLATE = "TỔNG KẾT: Tổng số xe: {total}, Cảnh báo: {anomalies}"
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.is_analyzing = False
         self.is_paused = False
+        # Chỉ repaint progress bar khi phần trăm (số nguyên) thay đổi
+        self._last_pct = -1
+        self._last_status = None
+        # Loại xe -> ô "Số lượng" của dòng tương ứng, tái sử dụng giữa các lần cập nhật
+        self._vehicle_count_items: Dict[str, QTableWidgetItem] = {}
+        self._ui_state = 'idle'  # init_ui dựng các nút ở trạng thái idle
         self.init_ui()
         
     def init_ui(self):
@@ -218,12 +235,10 @@ class AnalysisPanel(QWidget):
         if self.is_paused:
             # Resume
             self.is_paused = False
-            self.btn_pause.setText("⏸ Tạm dừng")
             self.resume_analysis_requested.emit()
         else:
             # Pause
             self.is_paused = True
-            self.btn_pause.setText("▶ Tiếp tục")
             self.pause_analysis_requested.emit()
         self._update_button_states()
     
@@ -236,39 +251,71 @@ class AnalysisPanel(QWidget):
     
     def _update_button_states(self):
         """Cập nhật trạng thái các nút"""
-        self.btn_start.setEnabled(not self.is_analyzing)
-        self.btn_pause.setEnabled(self.is_analyzing)
-        self.btn_stop.setEnabled(self.is_analyzing)
+        if not self.is_analyzing:
+            self._set_ui_state('idle')
+        elif self.is_paused:
+            self._set_ui_state('paused')
+        else:
+            self._set_ui_state('running')
     
-    def update_progress(self, progress_data: Dict):
+    def _set_ui_state(self, name: str):
         """
-        Cập nhật tiến trình phân tích
+        Áp dụng trạng thái nút trong _UI_STATES, bỏ qua nếu không đổi
         
         Args:
-            progress_data: Dict chứa thông tin tiến trình
+            name: 'idle', 'running' hoặc 'paused'
         """
-        # Update progress bar
-        total_frames = progress_data.get('total_frames', 1)
-        current_frame = progress_data.get('current_frame', 0)
-        self.progress_bar.setMaximum(total_frames)
-        self.progress_bar.setValue(current_frame)
+        if name == self._ui_state:
+            return
+        self._ui_state = name
+        
+        enabled_map, pause_text = self._UI_STATES[name]
+        for widget_name, enabled in enabled_map.items():
+            widget = getattr(self, widget_name)
+            if widget.isEnabled() != enabled:
+                widget.setEnabled(enabled)
+        if self.btn_pause.text() != pause_text:
+            self.btn_pause.setText(pause_text)
+    
+    def update_progress(self, progress):
+        """
+        Cập nhật tiến trình phân tích
         
+        Args:
+            progress: AnalysisProgress từ orchestrator
+        """
         # Update time info
-        current_time = progress_data.get('current_time', 0)
-        total_duration = progress_data.get('total_duration', 0)
+        current_time = progress.current_time
+        total_duration = progress.total_duration
         self.lbl_video_time.setText(
             f"Thời gian video: {self._format_time(current_time)} / {self._format_time(total_duration)}"
         )
         
         # Update FPS
-        fps = progress_data.get('fps', 0)
+        fps = progress.fps
         self.lbl_fps.setText(f"FPS xử lý: {fps:.1f}")
         
-        # Update status
-        status = progress_data.get('status', '')
+        # Update progress bar - 100 bước rời rạc, bỏ qua setValue khi
+        # phần trăm không đổi (tránh repaint vô ích)
+        total_frames = progress.total_frames or 1
+        current_frame = progress.current_frame
+        pct = current_frame * 100 // total_frames
+        status = progress.status
+        if pct == self._last_pct and status == self._last_status:
+            return
+        self._last_pct = pct
+        
+        if self.progress_bar.maximum() != total_frames:
+            self.progress_bar.setMaximum(total_frames)
+        self.progress_bar.setValue(current_frame)
+        
+        # Update status - stylesheet chỉ set lại khi trạng thái đổi
+        status_changed = status != self._last_status
+        self._last_status = status
         if status == 'analyzing':
-            percent = progress_data.get('percent_complete', 0)
-            self.lbl_status.setText(f"Đang phân tích... {percent:.1f}%")
+            self.lbl_status.setText(f"Đang phân tích... {pct}%")
+            if not status_changed:
+                return
             self.lbl_status.setStyleSheet("""
                 QLabel {
                     font-size: 14px;
@@ -305,40 +352,62 @@ class AnalysisPanel(QWidget):
             self.is_analyzing = False
             self._update_button_states()
     
-    def update_statistics(self, stats_data: Dict):
+    def update_statistics(self, stats):
         """
         Cập nhật thống kê real-time
         
         Args:
-            stats_data: Dict chứa thống kê
+            stats: RealTimeStats từ orchestrator
         """
         # Update total vehicles
-        total = stats_data.get('total_vehicles', 0)
+        total = stats.total_vehicles
         self.lbl_total_vehicles.setText(str(total))
         
         # Update current minute count
-        minute_count = stats_data.get('current_minute_count', 0)
+        minute_count = stats.current_minute_count
         self.lbl_minute_count.setText(str(minute_count))
         
         # Update anomalies
-        anomalies = stats_data.get('anomalies_detected', 0)
+        anomalies = stats.anomalies_detected
         self.lbl_anomalies.setText(str(anomalies))
         
         # Update vehicle breakdown table
-        vehicles_by_type = stats_data.get('vehicles_by_type', {})
-        self.vehicle_table.setRowCount(len(vehicles_by_type))
-        
-        for i, (vehicle_type, count) in enumerate(vehicles_by_type.items()):
-            self.vehicle_table.setItem(i, 0, QTableWidgetItem(vehicle_type))
-            count_item = QTableWidgetItem(str(count))
-            count_item.setTextAlignment(Qt.AlignCenter)
-            self.vehicle_table.setItem(i, 1, count_item)
+        vehicles_by_type = stats.vehicles_by_type or {}
+        self._update_vehicle_table(vehicles_by_type)
         
         # Update video timestamp if available
-        video_timestamp = stats_data.get('video_timestamp', '')
+        video_timestamp = stats.video_timestamp
         if video_timestamp and hasattr(self, 'lbl_video_timestamp'):
             self.lbl_video_timestamp.setText(f"Timestamp: {video_timestamp}")
     
+    def _update_vehicle_table(self, vehicles_by_type: Dict[str, int]):
+        """
+        Cập nhật bảng loại xe, chỉ tạo dòng mới cho loại xe mới
+        và chỉ setText khi số lượng thay đổi
+        
+        Args:
+            vehicles_by_type: Dict loại xe -> số lượng
+        """
+        items = self._vehicle_count_items
+        # Có loại xe biến mất -> dựng lại bảng từ đầu
+        if any(vehicle_type not in vehicles_by_type for vehicle_type in items):
+            items.clear()
+            self.vehicle_table.setRowCount(0)
+        
+        for vehicle_type, count in vehicles_by_type.items():
+            text = str(count)
+            count_item = items.get(vehicle_type)
+            if count_item is None:
+                row = self.vehicle_table.rowCount()
+                self.vehicle_table.setRowCount(row + 1)
+                self.vehicle_table.setItem(row, 0, QTableWidgetItem(vehicle_type))
+                count_item = QTableWidgetItem(text)
+                count_item.setTextAlignment(Qt.AlignCenter)
+                self.vehicle_table.setItem(row, 1, count_item)
+                items[vehicle_type] = count_item
+            elif count_item.text() != text:
+                count_item.setText(text)
+    
     def add_alert(self, alert_text: str):
         """Thêm cảnh báo mới"""
         timestamp = datetime.now().strftime("%H:%M:%S")
@@ -357,6 +426,8 @@ class AnalysisPanel(QWidget):
         self.is_paused = False
         self._update_button_states()
         
+        self._last_pct = -1
+        self._last_status = None
         self.progress_bar.setValue(0)
         self.lbl_status.setText("Sẵn sàng phân tích")
         self.lbl_status.setStyleSheet("""
@@ -376,6 +447,7 @@ class AnalysisPanel(QWidget):
         self.lbl_fps.setText("FPS xử lý: 0.0")
         
         self.vehicle_table.setRowCount(0)
+        self._vehicle_count_items.clear()
         self.clear_alerts()
     
     def show_final_results(self, results: Dict):
@@ -391,9 +463,10 @@ class AnalysisPanel(QWidget):
         # Add summary to alerts
         if 'traffic_statistics' in results:
             stats = results['traffic_statistics']
-            summary = f"TỔNG KẾT: Tổng số xe: {stats.get('total_vehicles', 0)}, "
-            summary += f"Cảnh báo: {stats.get('total_anomalies', 0)}"
-            self.add_alert(summary)
+            self.add_alert(self._SUMMARY_TEMPLATE.format(
+                total=stats.get('total_vehicles', 0),
+                anomalies=stats.get('total_anomalies', 0)
+            ))
     
     def _format_time(self, seconds: float) -> str:
         """Format seconds thành HH:MM:SS"""
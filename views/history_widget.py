@@ -1,15 +1,119 @@
 # views/history_widget.py
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTreeWidget,
-                            QTreeWidgetItem, QTabWidget, QTextBrowser,
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTreeView,
+                            QAbstractItemView, QTabWidget, QTextBrowser,
                             QTableWidget, QTableWidgetItem, QGroupBox,
                             QPushButton, QLineEdit, QComboBox, QDateEdit,
                             QLabel, QListWidget, QListWidgetItem, QHeaderView)
-from PyQt5.QtCore import Qt, QDate, pyqtSignal
+from PyQt5.QtCore import Qt, QDate, pyqtSignal, QAbstractTableModel, QModelIndex
 from PyQt5.QtGui import QFont, QColor
 
 from .base_view import BaseView
 
 
+class VideoListModel(QAbstractTableModel):
+    """
+    Model cho danh sách video lịch sử - chỉ giữ dữ liệu từng dòng,
+    QTreeView tự vẽ các dòng đang hiển thị
+    
+    Danh sách được tải theo trang nên model không tự sắp xếp lại các dòng:
+    sort() chỉ ghi nhận cột/chiều sort và phát sort_requested để controller
+    truy vấn lại (ORDER BY trong SQL)
+    """
+    
+    # column key, descending
+    sort_requested = pyqtSignal(str, bool)
+    
+    HEADERS = ["Tên file", "Ngày xử lý", "Tổng xe", "Thời lượng"]
+    
+    # Key trong video_info theo từng cột
+    _COLUMN_KEYS = ('file_name', 'processing_date', 'total_vehicles', 'duration')
+    
+    # Màu nền cột tên file theo trạng thái
+    _STATUS_COLORS = {
+        'completed': QColor(76, 175, 80).lighter(180),   # Green
+        'failed': QColor(244, 67, 54).lighter(180),      # Red
+        'error': QColor(244, 67, 54).lighter(180),       # Red (status do orchestrator ghi)
+    }
+    _DEFAULT_COLOR = QColor(33, 150, 243).lighter(180)   # Blue
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []           # video_info dicts
+        # Mặc định giống thứ tự truy vấn: mới xử lý trước
+        self._sort_column = self._COLUMN_KEYS.index('processing_date')
+        self._sort_order = Qt.DescendingOrder
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        
+        info = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return str(info[self._COLUMN_KEYS[index.column()]])
+        if role == Qt.UserRole:
+            return info['id']
+        if role == Qt.BackgroundRole and index.column() == 0:
+            return self._STATUS_COLORS.get(info['status'], self._DEFAULT_COLOR)
+        return None
+    
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Ghi nhận cột sort và yêu cầu tải lại danh sách theo thứ tự mới"""
+        if column < 0 or (column, order) == (self._sort_column, self._sort_order):
+            return
+        self._sort_column = column
+        self._sort_order = order
+        self.sort_requested.emit(*self.sort_key())
+    
+    def sort_key(self):
+        """
+        Get current sort for the page query
+        
+        Returns:
+            Tuple of (column key, descending)
+        """
+        return self._COLUMN_KEYS[self._sort_column], self._sort_order == Qt.DescendingOrder
+    
+    def sort_section(self):
+        """Get current sort column and order (cho sort indicator của header)"""
+        return self._sort_column, self._sort_order
+    
+    def append_videos(self, video_infos):
+        """
+        Add videos to the end of the list (trang mới đã theo thứ tự sort hiện tại)
+        
+        Args:
+            video_infos: List of video_info dicts
+        """
+        if not video_infos:
+            return
+        
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(video_infos) - 1)
+        self._rows.extend(video_infos)
+        self.endInsertRows()
+    
+    def video_id(self, row: int):
+        """Get video ID of a row"""
+        return self._rows[row]['id']
+    
+    def clear(self):
+        """Remove all rows"""
+        self.beginResetModel()
+        self._rows = []
+        self.endResetModel()
+
+
 class HistoryWidget(BaseView):
     """
     Widget for viewing historical analysis data
@@ -62,9 +166,15 @@ class HistoryWidget(BaseView):
         
         list_layout.addWidget(QLabel("Danh sách video đã xử lý:"))
         
-        self.video_list = QTreeWidget()
-        self.video_list.setHeaderLabels(["Tên file", "Ngày xử lý", "Tổng xe", "Thời lượng"])
+        self.video_model = VideoListModel(self)
+        self.video_list = QTreeView()
+        self.video_list.setModel(self.video_model)
+        self.video_list.setRootIsDecorated(False)
+        self.video_list.setUniformRowHeights(True)
+        self.video_list.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.video_list.setAlternatingRowColors(True)
+        # Sort indicator khớp thứ tự mặc định của truy vấn trước khi bật sorting
+        self.video_list.header().setSortIndicator(*self.video_model.sort_section())
         self.video_list.setSortingEnabled(True)
         
         # Adjust column widths
@@ -140,31 +250,11 @@ class HistoryWidget(BaseView):
         
     def add_video_item(self, video_info: dict):
         """Add video to list"""
-        item = QTreeWidgetItem([
-            video_info['file_name'],
-            video_info['processing_date'],
-            str(video_info['total_vehicles']),
-            video_info['duration']
-        ])
-        
-        # Store video ID
-        item.setData(0, 1, video_info['id'])  # Column 0, Role 1
-        
-        # Color code by status
-        if video_info['status'] == 'completed':
-            color = QColor(76, 175, 80)  # Green
-        elif video_info['status'] == 'failed':
-            color = QColor(244, 67, 54)  # Red
-        else:
-            color = QColor(33, 150, 243)  # Blue
-            
-        item.setBackground(0, color.lighter(180))
-        
-        self.video_list.addTopLevelItem(item)
+        self.video_model.append_videos([video_info])
         
     def clear_all(self):
         """Clear all data"""
-        self.video_list.clear()
+        self.video_model.clear()
         self.info_display.clear()
         self.stats_display.clear()
         self.time_table.clearContents()
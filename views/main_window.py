@@ -10,6 +10,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, pyqtSignal, pyqtSlot
 from PyQt5.QtGui import QIcon
 import logging
+import os
 from typing import Optional
 
 from views.video_player_widget import VideoPlayerWidget
@@ -19,6 +20,13 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Nội dung hộp thoại hoàn tất - dựng sẵn một lần, chỉ format khi dùng
+SUMMARY_TEMPLATE = (
+    "Đã hoàn tất phân tích video!\n\n"
+    "Tổng số phương tiện phát hiện: {total}\n\n"
+    "Kết quả đã được lưu vào cơ sở dữ liệu."
+)
+
 class MainWindow(QMainWindow):
     """
     Cửa sổ chính của ứng dụng Traffic Monitoring
@@ -29,6 +37,7 @@ class MainWindow(QMainWindow):
     
     def __init__(self):
         super().__init__()
+        self._error_box: Optional[QMessageBox] = None
         self.init_ui()
         
     def init_ui(self):
@@ -227,14 +236,33 @@ class MainWindow(QMainWindow):
         """
         self.status_bar.showMessage(message)
     
-    @pyqtSlot(dict)
-    def on_progress_updated(self, progress_data: dict):
-        """Cập nhật tiến trình phân tích"""
-        self.analysis_panel.update_progress(progress_data)
+    @pyqtSlot(str)
+    def show_error(self, message: str):
+        """
+        Hiển thị lỗi bằng hộp thoại không modal (open() thay vì exec_()),
+        event loop vẫn chạy nên playback không bị dồn frame
+        
+        Args:
+            message: Thông báo lỗi
+        """
+        self.update_status(message)
+        if os.environ.get('TRAFFIC_MON_NO_MODAL') == '1':
+            return
+        
+        # Lỗi mới cập nhật hộp thoại đang mở thay vì mở thêm
+        if self._error_box is None:
+            self._error_box = QMessageBox(QMessageBox.Critical, "Lỗi", "", QMessageBox.Ok, self)
+        self._error_box.setText(message)
+        self._error_box.open()
+    
+    @pyqtSlot(object)
+    def on_progress_updated(self, progress):
+        """Cập nhật tiến trình phân tích (AnalysisProgress)"""
+        self.analysis_panel.update_progress(progress)
         
         # Update status bar
-        percent = progress_data.get('percent_complete', 0)
-        status = progress_data.get('status', '')
+        percent = progress.percent_complete
+        status = progress.status
         if status == 'analyzing':
             self.update_status(f"Đang phân tích: {percent:.1f}%")
         elif status == 'completed':
@@ -242,10 +270,10 @@ class MainWindow(QMainWindow):
         elif status == 'error':
             self.update_status("Lỗi trong quá trình phân tích")
     
-    @pyqtSlot(dict)
-    def on_stats_updated(self, stats_data: dict):
-        """Cập nhật thống kê real-time"""
-        self.analysis_panel.update_statistics(stats_data)
+    @pyqtSlot(object)
+    def on_stats_updated(self, stats):
+        """Cập nhật thống kê real-time (RealTimeStats)"""
+        self.analysis_panel.update_statistics(stats)
     
     @pyqtSlot(object)
     def on_frame_updated(self, frame):
@@ -260,14 +288,16 @@ class MainWindow(QMainWindow):
         # Refresh history
         self.history_widget.clear_all()
         
-        # Show completion message
+        # Show completion message - bỏ qua hộp thoại modal khi chạy
+        # tự động/headless (TRAFFIC_MON_NO_MODAL=1)
         total_vehicles = results.get('traffic_statistics', {}).get('total_vehicles', 0)
+        if os.environ.get('TRAFFIC_MON_NO_MODAL') == '1':
+            logger.info("Analysis completed - total vehicles: %s", total_vehicles)
+            return
         QMessageBox.information(
             self,
             "Phân tích hoàn tất",
-            f"Đã hoàn tất phân tích video!\n\n"
-            f"Tổng số phương tiện phát hiện: {total_vehicles}\n\n"
-            f"Kết quả đã được lưu vào cơ sở dữ liệu."
+            SUMMARY_TEMPLATE.format(total=total_vehicles)
         )
     
     def closeEvent(self, event):
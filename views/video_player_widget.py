@@ -12,12 +12,24 @@ import cv2
 import numpy as np
 from pathlib import Path
 import logging
-from typing import Optional
+from typing import Optional, Tuple
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Style của vùng hiển thị khi đang có frame (đặt một lần, không đặt lại mỗi frame)
+VIDEO_STYLE = """
+    QLabel {
+        background-color: #000000;
+        border: 2px solid #333333;
+        border-radius: 5px;
+    }
+"""
+
+# Qt >= 5.14 nhận thẳng dữ liệu BGR, không cần cvtColor sang RGB
+_BGR_FORMAT = getattr(QImage, 'Format_BGR888', None)
+
 class VideoPlayerWidget(QWidget):
     """
     Widget để hiển thị video và kết quả phân tích real-time
@@ -32,6 +44,9 @@ class VideoPlayerWidget(QWidget):
         self.video_path: Optional[str] = None
         self.is_playing = False
         self.current_frame = None
+        self._showing_video = False  # video_label đang ở style VIDEO_STYLE
+        self._plan_key = None  # (frame shape, label size) của _plan
+        self._plan = None
         self.init_ui()
         
     def init_ui(self):
@@ -181,58 +196,92 @@ class VideoPlayerWidget(QWidget):
             return
         
         try:
-            # Store current frame
-            self.current_frame = frame.copy()
-            
-            # Convert to RGB
-            if len(frame.shape) == 3:
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Store current frame - frame có thể là buffer tái sử dụng của
+            # playback thread nên phải copy, ghi vào buffer sẵn có nếu cùng kích thước
+            if self.current_frame is not None and self.current_frame.shape == frame.shape:
+                np.copyto(self.current_frame, frame)
             else:
-                rgb_frame = frame
-            
-            # Resize to fit display area while maintaining aspect ratio
-            display_size = (self.video_label.width() - 4, self.video_label.height() - 4)
-            
-            h, w = rgb_frame.shape[:2]
-            aspect_ratio = w / h
+                self.current_frame = frame.copy()
             
-            if display_size[0] / display_size[1] > aspect_ratio:
-                # Fit to height
-                new_height = display_size[1]
-                new_width = int(new_height * aspect_ratio)
-            else:
-                # Fit to width
-                new_width = display_size[0]
-                new_height = int(new_width / aspect_ratio)
-            
-            # Resize frame
-            if new_width > 0 and new_height > 0:
-                rgb_frame = cv2.resize(rgb_frame, (new_width, new_height))
+            # Kích thước hiển thị/định dạng chỉ tính lại khi frame hoặc label đổi kích thước
+            plan = self._display_plan(frame.shape)
+            if plan is not None:
+                size, image_format, to_rgb = plan
+                
+                # Resize frame (trên frame BGR gốc, trước khi đổi màu - ít pixel hơn)
+                if size is not None:
+                    scaled = cv2.resize(frame, size)
+                else:
+                    scaled = np.ascontiguousarray(frame)
+                if to_rgb:
+                    scaled = cv2.cvtColor(scaled, cv2.COLOR_BGR2RGB)
                 
                 # Convert to QImage and display
-                height, width, channel = rgb_frame.shape
+                height, width = scaled.shape[:2]
                 bytes_per_line = 3 * width
                 q_image = QImage(
-                    rgb_frame.data,
+                    scaled.data,
                     width,
                     height,
                     bytes_per_line,
-                    QImage.Format_RGB888
+                    image_format
                 )
                 
                 pixmap = QPixmap.fromImage(q_image)
                 self.video_label.setPixmap(pixmap)
-                self.video_label.setStyleSheet("""
-                    QLabel {
-                        background-color: #000000;
-                        border: 2px solid #333333;
-                        border-radius: 5px;
-                    }
-                """)
+                if not self._showing_video:
+                    self.video_label.setStyleSheet(VIDEO_STYLE)
+                    self._showing_video = True
                 
         except Exception as e:
             logger.error(f"Error displaying frame: {e}")
     
+    def _display_plan(self, frame_shape) -> Optional[Tuple[Optional[Tuple[int, int]], int, bool]]:
+        """
+        Tính (và cache) cách hiển thị frame có kích thước frame_shape
+        
+        Frame của một video luôn cùng kích thước, nên kích thước resize và
+        định dạng QImage chỉ phụ thuộc (frame_shape, kích thước video_label).
+        
+        Args:
+            frame_shape: Shape của frame
+            
+        Returns:
+            (resize size hoặc None nếu giữ nguyên, QImage format, cần đổi BGR->RGB),
+            None nếu label quá nhỏ để hiển thị
+        """
+        # Resize to fit display area while maintaining aspect ratio
+        display_size = (self.video_label.width() - 4, self.video_label.height() - 4)
+        key = (frame_shape, display_size)
+        if key == self._plan_key:
+            return self._plan
+        
+        h, w = frame_shape[:2]
+        aspect_ratio = w / h
+        
+        if display_size[0] / display_size[1] > aspect_ratio:
+            # Fit to height
+            new_height = display_size[1]
+            new_width = int(new_height * aspect_ratio)
+        else:
+            # Fit to width
+            new_width = display_size[0]
+            new_height = int(new_width / aspect_ratio)
+        
+        if new_width > 0 and new_height > 0:
+            size = (new_width, new_height) if (new_width, new_height) != (w, h) else None
+            color = len(frame_shape) == 3
+            if color and _BGR_FORMAT is not None:
+                plan = (size, _BGR_FORMAT, False)
+            else:
+                plan = (size, QImage.Format_RGB888, color)
+        else:
+            plan = None
+        
+        self._plan_key = key
+        self._plan = plan
+        return plan
+    
     def update_analysis_frame(self, frame):
         """
         Cập nhật frame từ quá trình phân tích tự động
@@ -259,6 +308,7 @@ class VideoPlayerWidget(QWidget):
         """Reset player về trạng thái ban đầu"""
         self.video_path = None
         self.current_frame = None
+        self._showing_video = False
         self.video_label.clear()
         self.video_label.setText("Chọn video để bắt đầu phân tích")
         self.video_label.setStyleSheet("""